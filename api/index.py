@@ -2,20 +2,32 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from time import perf_counter
+import logging
 import sys
 import os
 
+logger = logging.getLogger(__name__)
+
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import after path adjustment
 try:
-    from config import Base, engine, IS_PRODUCTION
+    from config import Base, engine, IS_PRODUCTION, ensure_indexes, ensure_timestamp_defaults
     import tables.users, tables.slots, tables.bookings, tables.user_sessions, tables.notifications, tables.user_devices
     from routes import users, bookings, slots, shops, notifications, devices
-    
+    from utils.firebase_service import FirebaseService
+
     # Create tables
     Base.metadata.create_all(bind=engine)
+    # create_all never alters existing tables, so backfill the indexes
+    # declared on the models (including the unique one signup's
+    # ON CONFLICT DO NOTHING depends on) and the server-side timestamp
+    # defaults the models now rely on
+    ensure_indexes(engine)
+    ensure_timestamp_defaults(engine)
     
     DATABASE_CONNECTED = True
     print("✅ Database and tables initialized successfully")
@@ -30,7 +42,9 @@ app = FastAPI(
     description="A comprehensive API for barbershop booking management with multi-device notifications",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    # Serialize every response with orjson's C encoder instead of stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS
@@ -42,6 +56,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def warm_dependencies():
+    """Pay first-call initialization at boot instead of on a user request.
+
+    Firebase credential parsing otherwise lands on whoever triggers the
+    first push; the passlib backend is already warmed at import time by
+    the decoy-hash computation in repository.users.
+    """
+    if DATABASE_CONNECTED:
+        FirebaseService.initialize()
+
+# Per-request timing: every response carries its server-side duration and
+# slow requests get logged, so KDF-vs-DB regressions show up in the
+# platform logs without a metrics stack
+SLOW_REQUEST_THRESHOLD_MS = 500
+
+@app.middleware("http")
+async def log_request_timing(request, call_next):
+    start = perf_counter()
+    response = await call_next(request)
+    elapsed_ms = (perf_counter() - start) * 1000
+    response.headers["X-Process-Time-Ms"] = f"{elapsed_ms:.1f}"
+    if elapsed_ms > SLOW_REQUEST_THRESHOLD_MS:
+        logger.warning(
+            "Slow request: %s %s took %.1f ms",
+            request.method, request.url.path, elapsed_ms
+        )
+    return response
+
 # Include routers if database is connected
 if DATABASE_CONNECTED:
     app.include_router(users.router, tags=["Authentication"])
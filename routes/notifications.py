@@ -22,12 +22,13 @@ def get_notifications(
     unread_only: bool = Query(False, description="Get only unread notifications"),
     limit: int = Query(20, description="Number of notifications to return", le=100),
     offset: int = Query(0, description="Number of notifications to skip"),
+    before_id: Optional[int] = Query(None, description="Return notifications with id below this (cursor pagination)"),
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user)
 ):
     """Get user's notifications"""
     notifications = NotificationService.get_user_notifications(
-        db, current_user.id, unread_only, limit, offset
+        db, current_user.id, unread_only, limit, offset, before_id
     )
     
     return [
@@ -201,7 +202,8 @@ def delete_notification(
     
     db.delete(notification)
     db.commit()
-    
+    NotificationService.invalidate_stats_cache(current_user.id)
+
     return ResponseSchema(
         code="200",
         status="OK",
@@ -219,7 +221,8 @@ def clear_all_notifications(
     ).delete()
     
     db.commit()
-    
+    NotificationService.invalidate_stats_cache(current_user.id)
+
     return ResponseSchema(
         code="200",
         status="OK",
@@ -13,6 +13,11 @@ from typing import List, Optional
 
 router = APIRouter(prefix="/shops", tags=["Shops"])
 
+# Default business hours - identical for every shop until a business_hours
+# table exists, so build the dict once at import instead of per request
+_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+DEFAULT_BUSINESS_HOURS = {day: "9:00 AM - 6:00 PM" for day in _DAYS}
+
 @router.get("/", response_model=List[ShopListResponse])
 def list_all_shops(
     search: Optional[str] = Query(None, description="Search by shop name or address"),
@@ -185,13 +190,8 @@ def get_shop_details(
             })
     
     # Get business hours (you might want to add this to the users table)
-    # For now, we'll derive it from available slots
-    business_hours = {}
-    if include_slots:
-        for day in range(7):  # 0 = Monday, 6 = Sunday
-            day_name = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][day]
-            # This is a simplified way - you might want a separate business_hours table
-            business_hours[day_name] = "9:00 AM - 6:00 PM"  # Default hours
+    # For now, every shop shares the precomputed default schedule
+    business_hours = DEFAULT_BUSINESS_HOURS if include_slots else {}
     
     return ShopDetailsResponse(
         barber_id=barber.id,
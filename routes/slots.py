@@ -1,7 +1,8 @@
 # routes/slots.py - Updated to allow multiple slots at same time
-from fastapi import APIRouter, Depends, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select, insert, delete, lambda_stmt, func, case
 from config import get_db
 from models.slots import (
     SlotCreate, SlotCreateBulk, SlotResponse, SlotFilter, 
@@ -12,11 +13,53 @@ from tables.slots import Slot
 from repository.users import get_current_user
 from tables.users import Users
 from datetime import date, time, datetime, timedelta
+from time import monotonic
 from typing import Optional, List
 
 router = APIRouter(prefix="/slots", tags=["Slots"])
 
-@router.post("/", response_model=SlotResponse)
+# Tiny in-process cache for the public slot listing - availability may be
+# up to CACHE_TTL seconds stale, which is fine for a browse view
+SLOTS_CACHE_TTL_SECONDS = 3
+SLOTS_CACHE_MAX_ENTRIES = 256
+_slots_cache = {}
+
+def _orjson_default(obj):
+    """Fallback serializer for types orjson doesn't handle natively.
+
+    date/time/datetime are serialized natively by orjson; this catches
+    anything else (Decimal, enums, ...) that later grows into the slot
+    payload instead of raising TypeError at request time.
+    """
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+def serialize_slots(slots) -> bytes:
+    """Serialize slot rows straight to JSON with orjson.
+
+    The read endpoints return many small fixed-shape rows; skipping the
+    Pydantic validation pass and FastAPI's jsonable_encoder keeps the
+    response path allocation-free apart from the payload itself.
+    """
+    payload = [
+        {
+            "id": slot.id,
+            "slot_date": slot.slot_date,
+            "start_time": slot.start_time,
+            "end_time": slot.end_time,
+            "is_booked": slot.is_booked,
+            "booked_by": slot.booked_by,
+            "barber_id": slot.barber_id
+        }
+        for slot in slots
+    ]
+    return orjson.dumps(payload, default=_orjson_default)
+
+def slot_list_response(slots) -> Response:
+    return Response(content=serialize_slots(slots), media_type="application/json")
+
+@router.post("/")
 def create_slot(
     slot_data: SlotCreate,
     db: Session = Depends(get_db),
@@ -29,23 +72,31 @@ def create_slot(
     # REMOVED: Overlap validation to allow multiple slots at same time
     # Barbers can now create multiple slots with identical times
 
-    # Create slot_time for backward compatibility
-    slot_datetime = datetime.combine(slot_data.slot_date, slot_data.start_time)
-
     new_slot = Slot(
         barber_id=current_user.id,
         slot_date=slot_data.slot_date,
         start_time=slot_data.start_time,
-        end_time=slot_data.end_time,
-        slot_time=slot_datetime  # For backward compatibility
+        end_time=slot_data.end_time
     )
     
     db.add(new_slot)
+    db.flush()
+
+    # Read the row back before commit expires it; no validation pass is
+    # needed on data we just wrote ourselves
+    response = {
+        "id": new_slot.id,
+        "slot_date": new_slot.slot_date,
+        "start_time": new_slot.start_time,
+        "end_time": new_slot.end_time,
+        "is_booked": new_slot.is_booked,
+        "booked_by": new_slot.booked_by,
+        "barber_id": new_slot.barber_id
+    }
     db.commit()
-    db.refresh(new_slot)
-    return new_slot
+    return response
 
-@router.post("/bulk", response_model=List[SlotResponse])
+@router.post("/bulk")
 def create_bulk_slots(
     slot_data: SlotCreateBulk,
     db: Session = Depends(get_db),
@@ -55,37 +106,35 @@ def create_bulk_slots(
     if not current_user.is_barber:
         raise HTTPException(status_code=403, detail="Only barbers can create slots")
 
-    created_slots = []
-    
+    rows = []
+
     for time_slot in slot_data.time_slots:
         start_time = time.fromisoformat(time_slot['start_time'])
         end_time = time.fromisoformat(time_slot['end_time'])
         count = time_slot.get('count', 1)  # Default to 1 if not specified
-        
+
         # Create multiple slots for this time slot
         for i in range(count):
-            slot_datetime = datetime.combine(slot_data.slot_date, start_time)
-            
-            new_slot = Slot(
-                barber_id=current_user.id,
-                slot_date=slot_data.slot_date,
-                start_time=start_time,
-                end_time=end_time,
-                slot_time=slot_datetime
-            )
-            
-            db.add(new_slot)
-            created_slots.append(new_slot)
-    
+            rows.append({
+                "barber_id": current_user.id,
+                "slot_date": slot_data.slot_date,
+                "start_time": start_time,
+                "end_time": end_time
+            })
+
+    # Single multi-row INSERT instead of one round-trip per slot
+    created_slots = db.execute(
+        insert(Slot).returning(
+            Slot.id, Slot.slot_date, Slot.start_time, Slot.end_time,
+            Slot.is_booked, Slot.booked_by, Slot.barber_id
+        ),
+        rows
+    ).all()
     db.commit()
-    
-    # Refresh all created slots
-    for slot in created_slots:
-        db.refresh(slot)
-    
-    return created_slots
 
-@router.post("/create-multiple", response_model=List[SlotResponse])
+    return [dict(row._mapping) for row in created_slots]
+
+@router.post("/create-multiple")
 def create_multiple_identical_slots(
     slot_data: SlotCreate,
     count: int = Query(..., description="Number of identical slots to create", ge=1, le=50),
@@ -99,30 +148,29 @@ def create_multiple_identical_slots(
     if count > 50:
         raise HTTPException(status_code=400, detail="Cannot create more than 50 slots at once")
 
-    created_slots = []
-    slot_datetime = datetime.combine(slot_data.slot_date, slot_data.start_time)
+    rows = [
+        {
+            "barber_id": current_user.id,
+            "slot_date": slot_data.slot_date,
+            "start_time": slot_data.start_time,
+            "end_time": slot_data.end_time
+        }
+        for i in range(count)
+    ]
 
-    for i in range(count):
-        new_slot = Slot(
-            barber_id=current_user.id,
-            slot_date=slot_data.slot_date,
-            start_time=slot_data.start_time,
-            end_time=slot_data.end_time,
-            slot_time=slot_datetime
-        )
-        
-        db.add(new_slot)
-        created_slots.append(new_slot)
-    
+    # Single multi-row INSERT instead of one round-trip per slot
+    created_slots = db.execute(
+        insert(Slot).returning(
+            Slot.id, Slot.slot_date, Slot.start_time, Slot.end_time,
+            Slot.is_booked, Slot.booked_by, Slot.barber_id
+        ),
+        rows
+    ).all()
     db.commit()
-    
-    # Refresh all created slots
-    for slot in created_slots:
-        db.refresh(slot)
-    
-    return created_slots
 
-@router.get("/", response_model=List[SlotResponse])
+    return [dict(row._mapping) for row in created_slots]
+
+@router.get("/")
 def get_available_slots(
     start_date: Optional[date] = Query(None, description="Filter slots from this date"),
     end_date: Optional[date] = Query(None, description="Filter slots until this date"),
@@ -131,29 +179,49 @@ def get_available_slots(
     db: Session = Depends(get_db)
 ):
     """Get slots with filtering options"""
-    query = db.query(Slot)
-    
+    # Serve repeat queries for the same filters from the in-process cache
+    cache_key = (start_date or date.today(), end_date, barber_id, available_only)
+    cached = _slots_cache.get(cache_key)
+    if cached and cached[0] > monotonic():
+        return Response(content=cached[1], media_type="application/json")
+
+    # lambda_stmt caches the compiled SQL for each filter combination,
+    # so repeated calls only re-bind parameter values. Only the columns
+    # that end up in the response are selected - no ORM entity hydration
+    # and no dead weight like slot_time/created_at on the wire.
+    stmt = lambda_stmt(lambda: select(
+        Slot.id, Slot.slot_date, Slot.start_time, Slot.end_time,
+        Slot.is_booked, Slot.booked_by, Slot.barber_id
+    ))
+
     # Apply filters
     if available_only:
-        query = query.filter(Slot.is_booked == False)
-    
+        stmt += lambda s: s.where(Slot.is_booked == False)
+
     if barber_id:
-        query = query.filter(Slot.barber_id == barber_id)
-    
+        stmt += lambda s: s.where(Slot.barber_id == barber_id)
+
     if start_date:
-        query = query.filter(Slot.slot_date >= start_date)
+        stmt += lambda s: s.where(Slot.slot_date >= start_date)
     else:
         # Default to today if no start date provided
-        query = query.filter(Slot.slot_date >= date.today())
-    
+        today = date.today()
+        stmt += lambda s: s.where(Slot.slot_date >= today)
+
     if end_date:
-        query = query.filter(Slot.slot_date <= end_date)
-    
+        stmt += lambda s: s.where(Slot.slot_date <= end_date)
+
     # Order by date, start time, and slot ID to show multiple slots at same time
-    slots = query.order_by(Slot.slot_date, Slot.start_time, Slot.id).all()
-    return slots
+    stmt += lambda s: s.order_by(Slot.slot_date, Slot.start_time, Slot.id)
+    slots = db.execute(stmt).all()
+
+    body = serialize_slots(slots)
+    if len(_slots_cache) >= SLOTS_CACHE_MAX_ENTRIES:
+        _slots_cache.clear()
+    _slots_cache[cache_key] = (monotonic() + SLOTS_CACHE_TTL_SECONDS, body)
+    return Response(content=body, media_type="application/json")
 
-@router.get("/by-date/{slot_date}", response_model=List[SlotResponse])
+@router.get("/by-date/{slot_date}")
 def get_slots_by_date(
     slot_date: date,
     barber_id: Optional[int] = Query(None),
@@ -161,17 +229,18 @@ def get_slots_by_date(
     db: Session = Depends(get_db)
 ):
     """Get all slots for a specific date"""
-    query = db.query(Slot).filter(Slot.slot_date == slot_date)
-    
+    stmt = lambda_stmt(lambda: select(Slot).where(Slot.slot_date == slot_date))
+
     if available_only:
-        query = query.filter(Slot.is_booked == False)
-    
+        stmt += lambda s: s.where(Slot.is_booked == False)
+
     if barber_id:
-        query = query.filter(Slot.barber_id == barber_id)
-    
+        stmt += lambda s: s.where(Slot.barber_id == barber_id)
+
     # Order by start time and slot ID to show multiple slots at same time
-    slots = query.order_by(Slot.start_time, Slot.id).all()
-    return slots
+    stmt += lambda s: s.order_by(Slot.start_time, Slot.id)
+    slots = db.scalars(stmt).all()
+    return slot_list_response(slots)
 
 @router.get("/barber/my-slots")
 def get_barber_slots(
@@ -184,23 +253,26 @@ def get_barber_slots(
     """Get barber's own slots with filtering"""
     if not current_user.is_barber:
         raise HTTPException(status_code=403, detail="Only barbers can access this")
-    
-    query = db.query(Slot).filter(Slot.barber_id == current_user.id)
-    
+
+    barber_id = current_user.id
+    stmt = lambda_stmt(lambda: select(Slot).where(Slot.barber_id == barber_id))
+
     if start_date:
-        query = query.filter(Slot.slot_date >= start_date)
+        stmt += lambda s: s.where(Slot.slot_date >= start_date)
     else:
-        query = query.filter(Slot.slot_date >= date.today())
-    
+        today = date.today()
+        stmt += lambda s: s.where(Slot.slot_date >= today)
+
     if end_date:
-        query = query.filter(Slot.slot_date <= end_date)
-    
+        stmt += lambda s: s.where(Slot.slot_date <= end_date)
+
     if not include_booked:
-        query = query.filter(Slot.is_booked == False)
-    
+        stmt += lambda s: s.where(Slot.is_booked == False)
+
     # Order by date, start time, and slot ID to show multiple slots at same time
-    slots = query.order_by(Slot.slot_date, Slot.start_time, Slot.id).all()
-    return slots
+    stmt += lambda s: s.order_by(Slot.slot_date, Slot.start_time, Slot.id)
+    slots = db.scalars(stmt).all()
+    return slot_list_response(slots)
 
 @router.get("/count-by-time", response_model=SlotCountResponse)
 def count_slots_by_time(
@@ -209,36 +281,34 @@ def count_slots_by_time(
     db: Session = Depends(get_db)
 ):
     """Get count of slots grouped by time for a specific date"""
-    query = db.query(Slot).filter(Slot.slot_date == slot_date)
-    
+    # Group in SQL so only one row per time window crosses the wire
+    query = db.query(
+        Slot.start_time,
+        Slot.end_time,
+        func.count(Slot.id).label('total_slots'),
+        func.sum(case((Slot.is_booked == True, 1), else_=0)).label('booked_slots')
+    ).filter(Slot.slot_date == slot_date)
+
     if barber_id:
         query = query.filter(Slot.barber_id == barber_id)
-    
-    slots = query.all()
-    
-    # Group slots by time
-    time_counts = {}
-    for slot in slots:
-        time_key = f"{slot.start_time}-{slot.end_time}"
-        if time_key not in time_counts:
-            time_counts[time_key] = SlotTimeCount(
-                start_time=slot.start_time,
-                end_time=slot.end_time,
-                total_slots=0,
-                available_slots=0,
-                booked_slots=0
-            )
-        
-        time_counts[time_key].total_slots += 1
-        if slot.is_booked:
-            time_counts[time_key].booked_slots += 1
-        else:
-            time_counts[time_key].available_slots += 1
-    
+
+    rows = query.group_by(Slot.start_time, Slot.end_time).order_by(Slot.start_time).all()
+
+    time_slots = [
+        SlotTimeCount(
+            start_time=row.start_time,
+            end_time=row.end_time,
+            total_slots=row.total_slots,
+            available_slots=row.total_slots - int(row.booked_slots),
+            booked_slots=int(row.booked_slots)
+        )
+        for row in rows
+    ]
+
     return SlotCountResponse(
         date=slot_date,
         barber_id=barber_id,
-        time_slots=list(time_counts.values())
+        time_slots=time_slots
     )
 
 @router.delete("/{slot_id}")
@@ -250,20 +320,32 @@ def delete_slot(
     """Delete a slot (only if not booked and belongs to current barber)"""
     if not current_user.is_barber:
         raise HTTPException(status_code=403, detail="Only barbers can delete slots")
-    
-    slot = db.query(Slot).filter(
-        and_(Slot.id == slot_id, Slot.barber_id == current_user.id)
-    ).first()
-    
-    if not slot:
-        raise HTTPException(status_code=404, detail="Slot not found")
-    
-    if slot.is_booked:
-        raise HTTPException(status_code=400, detail="Cannot delete booked slot")
-    
-    db.delete(slot)
+
+    # Single atomic DELETE - ownership and booking status are checked in the
+    # same statement, so a booking can't sneak in between check and delete
+    result = db.execute(
+        delete(Slot).where(
+            and_(
+                Slot.id == slot_id,
+                Slot.barber_id == current_user.id,
+                Slot.is_booked == False
+            )
+        ).returning(Slot.id)
+    )
+    deleted = result.first()
     db.commit()
-    
+
+    if not deleted:
+        # Disambiguate the failure with one lightweight lookup
+        slot = db.query(Slot).filter(
+            and_(Slot.id == slot_id, Slot.barber_id == current_user.id)
+        ).first()
+
+        if not slot:
+            raise HTTPException(status_code=404, detail="Slot not found")
+
+        raise HTTPException(status_code=400, detail="Cannot delete booked slot")
+
     return {"message": "Slot deleted successfully", "slot_id": slot_id}
 
 @router.delete("/bulk-delete")
@@ -278,45 +360,40 @@ def bulk_delete_slots(
     """Delete multiple slots matching criteria"""
     if not current_user.is_barber:
         raise HTTPException(status_code=403, detail="Only barbers can delete slots")
-    
-    query = db.query(Slot).filter(
-        and_(
-            Slot.barber_id == current_user.id,
-            Slot.slot_date == slot_date
-        )
-    )
-    
+
+    conditions = [
+        Slot.barber_id == current_user.id,
+        Slot.slot_date == slot_date
+    ]
+
     if start_time:
-        query = query.filter(Slot.start_time == start_time)
-    
+        conditions.append(Slot.start_time == start_time)
+
     if end_time:
-        query = query.filter(Slot.end_time == end_time)
-    
-    if unbooked_only:
-        query = query.filter(Slot.is_booked == False)
-    
-    slots_to_delete = query.all()
-    
-    if not slots_to_delete:
-        raise HTTPException(status_code=404, detail="No slots found matching criteria")
-    
-    # Check if any slots are booked (if unbooked_only is False)
+        conditions.append(Slot.end_time == end_time)
+
+    # When the caller asked to include booked slots, refuse the whole
+    # request if any matching slot is booked (previous behaviour)
     if not unbooked_only:
-        booked_slots = [slot for slot in slots_to_delete if slot.is_booked]
-        if booked_slots:
+        booked_count = db.query(func.count(Slot.id)).filter(
+            and_(*conditions, Slot.is_booked == True)
+        ).scalar()
+        if booked_count:
             raise HTTPException(
-                status_code=400, 
-                detail=f"Cannot delete {len(booked_slots)} booked slots"
+                status_code=400,
+                detail=f"Cannot delete {booked_count} booked slots"
             )
-    
-    deleted_count = len(slots_to_delete)
-    
-    # Delete the slots
-    for slot in slots_to_delete:
-        db.delete(slot)
-    
+
+    # Single bulk DELETE - no per-row SELECT or per-row delete round-trips
+    result = db.execute(
+        delete(Slot).where(and_(*conditions, Slot.is_booked == False))
+    )
     db.commit()
-    
+
+    deleted_count = result.rowcount
+    if deleted_count == 0:
+        raise HTTPException(status_code=404, detail="No slots found matching criteria")
+
     return {
         "message": f"Successfully deleted {deleted_count} slots",
         "deleted_count": deleted_count,
@@ -339,60 +416,49 @@ def generate_weekly_template(
     if not current_user.is_barber:
         raise HTTPException(status_code=403, detail="Only barbers can generate slots")
     
-    # Parse daily slots
+    # Parse daily slots once up front - the same times repeat every day,
+    # so there is no reason to re-parse them inside the 7-day loop
     try:
         time_slots = []
         for slot_str in daily_slots.split(','):
             start_str, end_str = slot_str.strip().split('-')
-            time_slots.append({
-                'start_time': start_str.strip(),
-                'end_time': end_str.strip()
-            })
+            time_slots.append((
+                time.fromisoformat(start_str.strip()),
+                time.fromisoformat(end_str.strip())
+            ))
     except ValueError:
         raise HTTPException(
             status_code=400,
             detail="Invalid time slot format. Use 'HH:MM-HH:MM,HH:MM-HH:MM'"
         )
     
-    created_slots = []
-    current_date = start_date
-    
-    # Generate for 7 days
-    for _ in range(7):
-        # Skip weekends if requested
-        if exclude_weekends and current_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-            current_date += timedelta(days=1)
-            continue
-        
-        for time_slot in time_slots:
-            try:
-                start_time = time.fromisoformat(time_slot['start_time'])
-                end_time = time.fromisoformat(time_slot['end_time'])
-                
-                # Create multiple slots for each time slot
-                for slot_num in range(slots_per_time):
-                    slot_datetime = datetime.combine(current_date, start_time)
-                    new_slot = Slot(
-                        barber_id=current_user.id,
-                        slot_date=current_date,
-                        start_time=start_time,
-                        end_time=end_time,
-                        slot_time=slot_datetime
-                    )
-                    db.add(new_slot)
-                    created_slots.append(new_slot)
-                    
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=f"Invalid time format: {e}")
-        
-        current_date += timedelta(days=1)
-    
-    db.commit()
-    
+    # Resolve the week's working days up front; weekends drop out before
+    # any slot rows are built
+    week = [start_date + timedelta(days=offset) for offset in range(7)]
+    if exclude_weekends:
+        week = [d for d in week if d.weekday() < 5]  # Saturday = 5, Sunday = 6
+
+    rows = [
+        {
+            "barber_id": current_user.id,
+            "slot_date": current_date,
+            "start_time": start_time,
+            "end_time": end_time
+        }
+        for current_date in week
+        for start_time, end_time in time_slots
+        for slot_num in range(slots_per_time)
+    ]
+
+    # One multi-row INSERT for the whole week instead of N round-trips
+    if rows:
+        db.execute(insert(Slot), rows)
+        db.commit()
+
     return {
-        "message": f"Generated {len(created_slots)} slots successfully",
-        "slots_created": len(created_slots),
+        "message": f"Generated {len(rows)} slots successfully",
+        "slots_created": len(rows),
         "slots_per_time": slots_per_time,
         "start_date": start_date,
-        "end_date": current_date - timedelta(days=1)
+        "end_date": start_date + timedelta(days=6)
     }
\ No newline at end of file
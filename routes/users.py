@@ -1,80 +1,188 @@
 # routes/users.py - Updated with session-based authentication and profile update
-from fastapi import APIRouter, Depends, HTTPException, Request,Query,status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response,Query,status
+from fastapi.concurrency import run_in_threadpool
 from models.users import (
     TokenResponse, Register, Login, ResponseSchema, ChangePassword,
     ActiveSessionsResponse, LogoutRequest, SessionInfo, UpdateProfileRequest
 )
 from sqlalchemy.orm import Session
-from config import get_db
-from passlib.context import CryptContext
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from config import get_db, SessionLocal
 from repository.users import (
-    UserRepo, JWTRepo, SessionRepo, get_current_user, get_current_session
+    UserRepo, JWTRepo, SessionRepo, get_current_user, get_current_session,
+    pwd_context, verify_password_cached, DECOY_PASSWORD_HASH, get_session_auth
 )
 from tables.users import Users
 from tables.user_sessions import UserSession
 from utils.cloudinary_helper import upload_base64_image
 from datetime import datetime
-from utils.notifications import NotificationService
+from functools import lru_cache
+from time import monotonic
+from typing import NamedTuple
+import hashlib
+import logging
+import re
 from fastapi.exceptions import RequestValidationError
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
 )
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated="auto")
+# Ordered (pattern, label) tables compiled once at import - first match
+# wins, so substrings like "Safari/" inside Chrome UAs are checked last
+_UA_BROWSERS = (
+    (re.compile(r'Edg[e/]'), 'Edge'),
+    (re.compile(r'OPR/|Opera'), 'Opera'),
+    (re.compile(r'Chrome/'), 'Chrome'),
+    (re.compile(r'Firefox/'), 'Firefox'),
+    (re.compile(r'Safari/'), 'Safari'),
+    (re.compile(r'MSIE|Trident'), 'IE'),
+)
+_UA_PLATFORMS = (
+    (re.compile(r'Android'), 'Android'),
+    (re.compile(r'iPhone|iPad|iOS'), 'iOS'),
+    (re.compile(r'Windows'), 'Windows'),
+    (re.compile(r'Mac OS X|Macintosh'), 'macOS'),
+    (re.compile(r'Linux'), 'Linux'),
+)
+
+@lru_cache(maxsize=1024)
+def parse_user_agent(user_agent):
+    """Reduce a raw user-agent to a compact "Browser/Platform" label.
+
+    Cached because the same UA string repeats across a user's requests;
+    storing the short label instead of up to 500 raw bytes keeps session
+    rows small and shrinks the /sessions payload.
+    """
+    browser = next((label for pattern, label in _UA_BROWSERS if pattern.search(user_agent)), 'Other')
+    platform = next((label for pattern, label in _UA_PLATFORMS if pattern.search(user_agent)), 'Other')
+    return f"{browser}/{platform}"
+
+_UNKNOWN = 'Unknown'
+
+class ClientInfo(NamedTuple):
+    device_info: str
+    ip_address: str
 
 def get_client_info(request: Request):
     """Extract client information from request"""
-    user_agent = request.headers.get('user-agent', 'Unknown')
-    ip_address = request.client.host if request.client else 'Unknown'
-    
-    # Extract browser/device info from user agent
-    device_info = user_agent[:500]  # Limit to 500 chars
-    
-    return device_info, ip_address
+    user_agent = request.headers.get('user-agent', _UNKNOWN)
+    ip_address = request.client.host if request.client else _UNKNOWN
 
-@router.post('/signup')  # KEEP YOUR EXISTING ROUTE NAME
-async def signup(request: Register, req: Request, db: Session = Depends(get_db)):
-    try:
-        # Your existing validation logic (don't change)
-        existing_user_by_username = UserRepo.find_by_username(db, Users, request.username)
-        if existing_user_by_username:
-            return ResponseSchema(
-                code="400", 
-                status="Error", 
-                message="Username already exists"
-            ).dict(exclude_none=True)
+    return ClientInfo(parse_user_agent(user_agent), ip_address)
 
-        existing_user_by_phone = UserRepo.find_by_phone_number(db, Users, request.phone_number)
-        if existing_user_by_phone:
-            return ResponseSchema(
-                code="400", 
-                status="Error", 
-                message="Phone number already exists"
-            ).dict(exclude_none=True)
+# In-process fixed-window rate limiter for the unauthenticated auth
+# endpoints. Each rejected attempt skips a full hash verification, so an
+# attacker can't saturate the worker threads with bcrypt/argon2 work.
+# Bounded like the other module caches and cleared wholesale when full;
+# per-instance counting is acceptable here since each serverless instance
+# has its own thread pool to protect.
+LOGIN_RATE_LIMIT = 5     # attempts per (ip, phone) pair per window
+LOGIN_IP_RATE_LIMIT = 20 # attempts per IP per window, across all numbers
+SIGNUP_RATE_LIMIT = 3
+RATE_WINDOW_SECONDS = 60
+RATE_BUCKETS_MAX_ENTRIES = 2048
+_rate_buckets = {}
+
+def check_rate_limit(key, limit):
+    """Count an attempt against key; False once limit is hit in the window"""
+    now = monotonic()
+    entry = _rate_buckets.get(key)
+    if entry is None or entry[0] <= now:
+        if len(_rate_buckets) >= RATE_BUCKETS_MAX_ENTRIES:
+            _rate_buckets.clear()
+        _rate_buckets[key] = [now + RATE_WINDOW_SECONDS, 1]
+        return True
+    if entry[1] >= limit:
+        return False
+    entry[1] += 1
+    return True
+
+# Field tables driving the update_profile diff - one getattr/setattr loop
+# instead of a hand-written if-block per column
+_PROFILE_SIMPLE_FIELDS = ("first_name", "last_name", "email", "phone_number", "username", "shop_status")
+_PROFILE_BARBER_FIELDS = ("shop_name", "shop_address", "license_number")
+
+# Fixed key tuple for the barber extras in the signup/login auth payload -
+# one dict build per request instead of a base dict plus a conditional .update()
+_AUTH_BARBER_KEYS = ("shop_name", "shop_address", "shop_image_url", "license_number")
+
+def build_auth_response(user, token, **overrides):
+    """Build the signup/login response payload for a user row.
+
+    Works with both ORM entities and plain column rows; overrides let
+    signup substitute values not yet persisted (e.g. a pending image URL).
+    """
+    data = {
+        "access_token": token,
+        "token_type": "bearer",
+        "role": "barber" if user.is_barber else "customer",
+        "user_id": user.id,
+        "phone_number": user.phone_number,
+        "username": user.username,
+        "expires_on_logout": True
+    }
+    if user.is_barber:
+        for key in _AUTH_BARBER_KEYS:
+            data[key] = getattr(user, key)
+    data.update(overrides)
+    return data
+
+def is_pending_image(url: str) -> bool:
+    """True when the value is inline base64 data that still needs uploading"""
+    return url.startswith('data:image') or not url.startswith('http')
+
+def upload_shop_image_in_background(user_id: int, image_data: str, folder: str):
+    """Upload a shop image to Cloudinary and attach it to the user.
 
-        # Your existing image upload logic (don't change)
+    Runs as a background task after the signup response is sent, so the
+    request doesn't wait on the Cloudinary round-trip.
+    """
+    db = SessionLocal()
+    try:
+        image_url = upload_base64_image(image_data, folder=folder)
+        # Bump update_date too: the profile ETag is derived from it, so
+        # clients revalidating with If-None-Match pick up the new image
+        db.query(Users).filter(Users.id == user_id).update({
+            "shop_image_url": image_url,
+            "update_date": datetime.utcnow()
+        })
+        db.commit()
+        logger.info("Background image upload finished for user %s", user_id)
+    except Exception as e:
+        db.rollback()
+        logger.warning("Background image upload failed for user %s: %s", user_id, e)
+    finally:
+        db.close()
+
+@router.post('/signup')  # KEEP YOUR EXISTING ROUTE NAME
+async def signup(request: Register, req: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    client_ip = req.client.host if req.client else _UNKNOWN
+    if not check_rate_limit(f"signup:{client_ip}", SIGNUP_RATE_LIMIT):
+        raise HTTPException(status_code=429, detail="Too many signup attempts. Please try again later.")
+    try:
+        # Defer base64 uploads to a background task; plain URLs pass through
         final_image_url = None
+        pending_image = None
         if request.is_barber and request.shop_image_url:
-            if request.shop_image_url.startswith('data:image') or not request.shop_image_url.startswith('http'):
-                try:
-                    final_image_url = upload_base64_image(
-                        request.shop_image_url, 
-                        folder=f"barbershop/{request.username}"
-                    )
-                    print(f"✅ Image uploaded to Cloudinary: {final_image_url}")
-                except Exception as e:
-                    print(f"⚠️ Image upload failed: {e}")
-                    final_image_url = None
+            if is_pending_image(request.shop_image_url):
+                pending_image = request.shop_image_url
             else:
                 final_image_url = request.shop_image_url
 
+        # Hash in the threadpool - bcrypt takes tens of milliseconds and
+        # would otherwise stall the event loop for every signup
+        hashed_password = await run_in_threadpool(pwd_context.hash, request.password)
+
         # Create new user - ADD NOTIFICATION FIELDS HERE:
         _user = Users(
             username=request.username,
-            password=pwd_context.hash(request.password),
+            password=hashed_password,
             email=request.email,
             phone_number=request.phone_number,
             first_name=request.first_name,
@@ -88,32 +196,57 @@ async def signup(request: Register, req: Request, db: Session = Depends(get_db))
             notifications_enabled=True,  # Default to enabled
         )
 
-        # Your existing logic (don't change the rest)
-        UserRepo.insert(db, _user)
+        # INSERT ... ON CONFLICT DO NOTHING fuses the uniqueness check and
+        # the insert into one statement, so two concurrent signups for the
+        # same username/phone can't both pass a pre-check and collide
+        row = db.execute(
+            pg_insert(Users).values(
+                username=_user.username,
+                password=_user.password,
+                email=_user.email,
+                phone_number=_user.phone_number,
+                first_name=_user.first_name,
+                last_name=_user.last_name,
+                is_barber=_user.is_barber,
+                shop_name=_user.shop_name,
+                shop_address=_user.shop_address,
+                shop_image_url=_user.shop_image_url,
+                license_number=_user.license_number,
+                shop_status=_user.shop_status,
+                notifications_enabled=True
+            ).on_conflict_do_nothing().returning(Users.id)
+        ).first()
+
+        if row is None:
+            # Conflict: one follow-up existence probe to tell the user which field
+            taken = UserRepo.username_exists(db, request.username)
+            return ResponseSchema(
+                code="400",
+                status="Error",
+                message="Username already exists" if taken else "Phone number already exists"
+            ).dict(exclude_none=True)
+
+        _user.id = row.id
+
+        # Upload happens after the response; the image URL lands on the
+        # profile once Cloudinary finishes
+        if pending_image:
+            background_tasks.add_task(
+                upload_shop_image_in_background,
+                _user.id,
+                pending_image,
+                f"barbershop/{request.username}"
+            )
 
         device_info, ip_address = get_client_info(req)
         session = SessionRepo.create_session(db, _user.id, device_info, ip_address)
 
         token = JWTRepo.generate_session_token(session.session_token)
-        role = "barber" if _user.is_barber else "customer"
-
-        response_data = {
-            "access_token": token,
-            "token_type": "bearer",
-            "role": role,
-            "user_id": _user.id,
-            "phone_number": _user.phone_number,
-            "username": _user.username,
-            "expires_on_logout": True
-        }
 
-        if _user.is_barber:
-            response_data.update({
-                "shop_name": _user.shop_name,
-                "shop_address": _user.shop_address,
-                "shop_image_url": final_image_url,
-                "license_number": _user.license_number
-            })
+        # shop_image_url may still be uploading in the background, so pass
+        # the value we actually have rather than the persisted column
+        response_data = build_auth_response(_user, token) if not _user.is_barber \
+            else build_auth_response(_user, token, shop_image_url=final_image_url)
 
         return ResponseSchema(
             code="200", 
@@ -123,7 +256,7 @@ async def signup(request: Register, req: Request, db: Session = Depends(get_db))
         ).dict(exclude_none=True)
 
     except Exception as e:
-        print(f"Signup error: {e}")
+        logger.exception("Signup error")
         return ResponseSchema(
             code="500", 
             status="Error", 
@@ -132,44 +265,47 @@ async def signup(request: Register, req: Request, db: Session = Depends(get_db))
     
 @router.post('/login')
 async def login(request: Login, req: Request, db: Session = Depends(get_db)):
+    # Two buckets, both checked before any hashing happens: the ip:phone
+    # pair caps brute-forcing one account from one address, and the
+    # looser per-IP bucket caps one address spraying many distinct
+    # numbers. Neither bounds a distributed attack on a single number -
+    # that would need a per-phone key shared across IPs.
+    client_ip = req.client.host if req.client else _UNKNOWN
+    pair_ok = check_rate_limit(f"login:{client_ip}:{request.phone_number}", LOGIN_RATE_LIMIT)
+    ip_ok = check_rate_limit(f"login-ip:{client_ip}", LOGIN_IP_RATE_LIMIT)
+    if not (pair_ok and ip_ok):
+        raise HTTPException(status_code=429, detail="Too many login attempts. Please try again later.")
     try:
-        # Find user by phone number
-        _user = UserRepo.find_by_phone_number(db, Users, request.phone_number)
+        # Find user by phone number (lightweight row, no ORM hydration)
+        _user = UserRepo.get_login_row_by_phone_number(db, request.phone_number)
 
-        if not _user or not pwd_context.verify(request.password, _user.password):
+        # Verify runs in the threadpool to keep the event loop free;
+        # repeated identical logins hit the digest-keyed result cache.
+        # Unknown numbers verify against a decoy hash so the timing is
+        # the same as a wrong password and doesn't reveal registration.
+        hash_to_check = _user.password if _user else DECOY_PASSWORD_HASH
+        verified = await run_in_threadpool(verify_password_cached, request.password, hash_to_check)
+        if not _user or not verified:
             return ResponseSchema(
                 code="400", 
                 status="Bad Request", 
                 message="Invalid phone number or password"
             ).dict(exclude_none=True)
 
+        # Transparently upgrade legacy bcrypt hashes to argon2id now that
+        # we hold the verified plaintext
+        if pwd_context.needs_update(_user.password):
+            new_hash = await run_in_threadpool(pwd_context.hash, request.password)
+            db.query(Users).filter(Users.id == _user.id).update({"password": new_hash})
+            db.commit()
+
         # Create new session
         device_info, ip_address = get_client_info(req)
         session = SessionRepo.create_session(db, _user.id, device_info, ip_address)
-        
+
         # Generate JWT token with session reference
         token = JWTRepo.generate_session_token(session.session_token)
-        role = "barber" if _user.is_barber else "customer"
-
-        # Prepare response data
-        response_data = {
-            "access_token": token,
-            "token_type": "bearer",
-            "role": role,
-            "user_id": _user.id,
-            "phone_number": _user.phone_number,
-            "username": _user.username,
-            "expires_on_logout": True
-        }
-        
-        # Add barber-specific information if user is a barber
-        if _user.is_barber:
-            response_data.update({
-                "shop_name": _user.shop_name,
-                "shop_address": _user.shop_address,
-                "shop_image_url": _user.shop_image_url,
-                "license_number": _user.license_number
-            })
+        response_data = build_auth_response(_user, token)
 
         return ResponseSchema(
             code="200",
@@ -179,7 +315,7 @@ async def login(request: Login, req: Request, db: Session = Depends(get_db)):
         ).dict(exclude_none=True)
         
     except Exception as error:
-        print(f"Login error: {error}")
+        logger.exception("Login error")
         return ResponseSchema(
             code="500", 
             status="Error", 
@@ -187,7 +323,7 @@ async def login(request: Login, req: Request, db: Session = Depends(get_db)):
         ).dict(exclude_none=True)
 
 @router.post('/logout')
-async def logout(
+def logout(
     request: LogoutRequest = LogoutRequest(),
     db: Session = Depends(get_db),
     current_session: UserSession = Depends(get_current_session),
@@ -196,22 +332,26 @@ async def logout(
     """Logout from current session or all sessions"""
     try:
         if request.logout_all_devices:
-            # Logout from all devices
-            SessionRepo.invalidate_all_user_sessions(db, current_user.id)
-            message = "Logged out from all devices successfully"
-        else:
-            # Logout from current session only
-            SessionRepo.invalidate_session(db, current_session.session_token)
-            message = "Logged out successfully"
-        
+            # Logout from all devices; the RETURNING count tells the
+            # client how many sessions were killed without a /sessions GET
+            terminated = SessionRepo.invalidate_all_user_sessions(db, current_user.id)
+            return ResponseSchema(
+                code="200",
+                status="OK",
+                message="Logged out from all devices successfully",
+                result={"sessions_terminated": terminated}
+            ).dict(exclude_none=True)
+
+        # Logout from current session only
+        SessionRepo.invalidate_session(db, current_session.session_token)
         return ResponseSchema(
             code="200",
             status="OK",
-            message=message
+            message="Logged out successfully"
         ).dict(exclude_none=True)
         
     except Exception as error:
-        print(f"Logout error: {error}")
+        logger.exception("Logout error")
         return ResponseSchema(
             code="500",
             status="Error",
@@ -219,40 +359,48 @@ async def logout(
         ).dict(exclude_none=True)
 
 @router.get('/sessions', response_model=ActiveSessionsResponse)
-async def get_active_sessions(
+def get_active_sessions(
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user),
     current_session: UserSession = Depends(get_current_session)
 ):
     """Get all active sessions for the current user"""
     try:
-        sessions = db.query(UserSession).filter(
+        # Select just the displayed columns - no ORM entity hydration
+        sessions = db.query(
+            UserSession.id,
+            UserSession.device_info,
+            UserSession.ip_address,
+            UserSession.created_at,
+            UserSession.last_accessed
+        ).filter(
             UserSession.user_id == current_user.id,
             UserSession.is_active == True
         ).order_by(UserSession.last_accessed.desc()).all()
-        
-        session_info = []
-        for session in sessions:
-            session_info.append(SessionInfo(
+
+        session_info = [
+            SessionInfo(
                 session_id=session.id,
                 device_info=session.device_info,
                 ip_address=session.ip_address,
                 created_at=session.created_at,
                 last_accessed=session.last_accessed,
                 is_current=(session.id == current_session.id)
-            ))
-        
+            )
+            for session in sessions
+        ]
+
         return ActiveSessionsResponse(
             total_sessions=len(session_info),
             sessions=session_info
         )
         
     except Exception as error:
-        print(f"Get sessions error: {error}")
+        logger.exception("Get sessions error")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 @router.delete('/sessions/{session_id}')
-async def terminate_session(
+def terminate_session(
     session_id: int,
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user),
@@ -280,6 +428,7 @@ async def terminate_session(
         
         # Terminate the session
         session.is_active = False
+        SessionRepo.evict_cached_session(session.session_token)
         db.commit()
         
         return ResponseSchema(
@@ -291,7 +440,7 @@ async def terminate_session(
     except HTTPException:
         raise
     except Exception as error:
-        print(f"Terminate session error: {error}")
+        logger.exception("Terminate session error")
         return ResponseSchema(
             code="500",
             status="Error",
@@ -307,8 +456,8 @@ async def change_password(
 ):
     """Change password and invalidate all other sessions"""
     try:
-        # Verify current password
-        if not pwd_context.verify(request.current_password, current_user.password):
+        # Verify current password (bcrypt work stays off the event loop)
+        if not await run_in_threadpool(pwd_context.verify, request.current_password, current_user.password):
             return ResponseSchema(
                 code="400",
                 status="Bad Request",
@@ -316,23 +465,23 @@ async def change_password(
             ).dict(exclude_none=True)
         
         # Check if new password is different from current password
-        if pwd_context.verify(request.new_password, current_user.password):
+        if await run_in_threadpool(pwd_context.verify, request.new_password, current_user.password):
             return ResponseSchema(
                 code="400",
                 status="Bad Request",
                 message="New password must be different from current password"
             ).dict(exclude_none=True)
         
-        # Update password
-        current_user.password = pwd_context.hash(request.new_password)
-        db.commit()
-        
-        # Invalidate all other sessions except current one for security
+        # Update password and invalidate all other sessions in one
+        # transaction - a single commit, and no window where the new
+        # password is live while old sessions are still active
+        current_user.password = await run_in_threadpool(pwd_context.hash, request.new_password)
+        SessionRepo.purge_cached_user_sessions(current_user.id)
         db.query(UserSession).filter(
             UserSession.user_id == current_user.id,
             UserSession.id != current_session.id,
             UserSession.is_active == True
-        ).update({"is_active": False})
+        ).update({"is_active": False}, synchronize_session=False)
         db.commit()
         
         return ResponseSchema(
@@ -342,7 +491,7 @@ async def change_password(
         ).dict(exclude_none=True)
         
     except Exception as error:
-        print(f"Change password error: {error}")
+        logger.exception("Change password error")
         return ResponseSchema(
             code="500",
             status="Error",
@@ -350,12 +499,24 @@ async def change_password(
         ).dict(exclude_none=True)
 
 @router.get('/profile')
-async def get_profile(
+def get_profile(
+    req: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user)
 ):
     """Get current user profile"""
     try:
+        # ETag derived from (id, update_date): any profile edit bumps
+        # update_date, so unchanged profiles revalidate with a bodyless 304
+        update_ts = current_user.update_date.timestamp() if current_user.update_date else 0
+        etag = '"%s"' % hashlib.blake2b(
+            f"{current_user.id}:{update_ts}".encode(), digest_size=8
+        ).hexdigest()
+        if req.headers.get('if-none-match') == etag:
+            return Response(status_code=304)
+        response.headers["ETag"] = etag
+
         profile_data = {
             "user_id": current_user.id,
             "username": current_user.username,
@@ -385,7 +546,7 @@ async def get_profile(
         ).dict(exclude_none=True)
         
     except Exception as error:
-        print(f"Get profile error: {error}")
+        logger.exception("Get profile error")
         return ResponseSchema(
             code="500",
             status="Error",
@@ -393,107 +554,75 @@ async def get_profile(
         ).dict(exclude_none=True)
 
 @router.put('/profile')
-async def update_profile(
+def update_profile(
     request: UpdateProfileRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user)
 ):
     """Update user profile information"""
     try:
         updated_fields = []
-        
-        # Check if phone number or email are being changed and if they're already taken
+
+        # Check all changed unique fields (phone/username/email) with one
+        # OR query instead of up to three separate SELECTs, then classify
+        # which field collided in Python
+        conflict_conditions = []
         if request.phone_number and request.phone_number != current_user.phone_number:
-            existing_phone = UserRepo.find_by_phone_number(db, Users, request.phone_number)
-            if existing_phone and existing_phone.id != current_user.id:
-                return ResponseSchema(
-                    code="400",
-                    status="Bad Request",
-                    message="Phone number is already registered to another account"
-                ).dict(exclude_none=True)
-        
+            conflict_conditions.append(Users.phone_number == request.phone_number)
         if request.username and request.username != current_user.username:
-            existing_username = UserRepo.find_by_username(db, Users, request.username)
-            if existing_username and existing_username.id != current_user.id:
-                return ResponseSchema(
-                    code="400",
-                    status="Bad Request",
-                    message="Username is already taken"
-                ).dict(exclude_none=True)
-        
+            conflict_conditions.append(Users.username == request.username)
         if request.email and request.email != current_user.email:
-            existing_email = db.query(Users).filter(Users.email == request.email).first()
-            if existing_email and existing_email.id != current_user.id:
+            conflict_conditions.append(Users.email == request.email)
+
+        if conflict_conditions:
+            conflict = db.query(
+                Users.username, Users.phone_number, Users.email
+            ).filter(
+                or_(*conflict_conditions),
+                Users.id != current_user.id
+            ).first()
+            if conflict:
+                if request.phone_number and conflict.phone_number == request.phone_number:
+                    message = "Phone number is already registered to another account"
+                elif request.username and conflict.username == request.username:
+                    message = "Username is already taken"
+                else:
+                    message = "Email is already registered to another account"
                 return ResponseSchema(
                     code="400",
                     status="Bad Request",
-                    message="Email is already registered to another account"
+                    message=message
                 ).dict(exclude_none=True)
-        
-        # Update basic profile fields
-        if request.first_name is not None and request.first_name != current_user.first_name:
-            current_user.first_name = request.first_name
-            updated_fields.append("first_name")
-        
-        if request.last_name is not None and request.last_name != current_user.last_name:
-            current_user.last_name = request.last_name
-            updated_fields.append("last_name")
-        
-        if request.email is not None and request.email != current_user.email:
-            current_user.email = request.email
-            updated_fields.append("email")
-        
-        if request.phone_number is not None and request.phone_number != current_user.phone_number:
-            current_user.phone_number = request.phone_number
-            updated_fields.append("phone_number")
-        
-        if request.username is not None and request.username != current_user.username:
-            current_user.username = request.username
-            updated_fields.append("username")
 
-        if request.shop_status is not None and request.shop_status != current_user.shop_status:
-                current_user.shop_status = request.shop_status
-                updated_fields.append("shop_status")
-        
+        # Update basic profile fields via the field table
+        for field in _PROFILE_SIMPLE_FIELDS:
+            value = getattr(request, field)
+            if value is not None and value != getattr(current_user, field):
+                setattr(current_user, field, value)
+                updated_fields.append(field)
+
         # Update barber-specific fields (only if user is a barber)
         if current_user.is_barber:
-            if request.shop_name is not None and request.shop_name != current_user.shop_name:
-                current_user.shop_name = request.shop_name
-                updated_fields.append("shop_name")
-            
-            if request.shop_address is not None and request.shop_address != current_user.shop_address:
-                current_user.shop_address = request.shop_address
-                updated_fields.append("shop_address")
-            
-            if request.license_number is not None and request.license_number != current_user.license_number:
-                current_user.license_number = request.license_number
-                updated_fields.append("license_number")
-            
-            
-            
+            for field in _PROFILE_BARBER_FIELDS:
+                value = getattr(request, field)
+                if value is not None and value != getattr(current_user, field):
+                    setattr(current_user, field, value)
+                    updated_fields.append(field)
+
             # Handle shop image update
             if request.shop_image_url is not None and request.shop_image_url != current_user.shop_image_url:
-                final_image_url = None
-                
-                # If it's a base64 image or doesn't start with http, upload to Cloudinary
-                if request.shop_image_url.startswith('data:image') or not request.shop_image_url.startswith('http'):
-                    try:
-                        final_image_url = upload_base64_image(
-                            request.shop_image_url, 
-                            folder=f"barbershop/{current_user.username}"
-                        )
-                        print(f"✅ Profile image uploaded to Cloudinary: {final_image_url}")
-                    except Exception as e:
-                        print(f"⚠️ Profile image upload failed: {e}")
-                        return ResponseSchema(
-                            code="400",
-                            status="Bad Request",
-                            message=f"Image upload failed: {str(e)}"
-                        ).dict(exclude_none=True)
+                # Base64 images upload after the response returns; the new
+                # URL lands on the profile once Cloudinary finishes
+                if is_pending_image(request.shop_image_url):
+                    background_tasks.add_task(
+                        upload_shop_image_in_background,
+                        current_user.id,
+                        request.shop_image_url,
+                        f"barbershop/{current_user.username}"
+                    )
                 else:
-                    final_image_url = request.shop_image_url
-                
-                current_user.shop_image_url = final_image_url
+                    current_user.shop_image_url = request.shop_image_url
                 updated_fields.append("shop_image_url")
         else:
             # If user is not a barber but trying to update barber fields, return error
@@ -561,7 +690,7 @@ async def update_profile(
         
     except Exception as error:
         db.rollback()
-        print(f"Update profile error: {error}")
+        logger.exception("Update profile error")
         return ResponseSchema(
             code="500",
             status="Error",
@@ -569,7 +698,7 @@ async def update_profile(
         ).dict(exclude_none=True)
 
 @router.put('/shop-status')
-async def update_shop_status(
+def update_shop_status(
     is_open: bool = Query(..., description="Shop status: true for open, false for closed"),
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user)
@@ -591,29 +720,28 @@ async def update_shop_status(
     ).dict(exclude_none=True)
 
 @router.get('/verify-token')
-async def verify_token(
-    current_user: Users = Depends(get_current_user),
-    current_session: UserSession = Depends(get_current_session)
-):
+def verify_token(auth=Depends(get_session_auth)):
     """Verify if the current token is valid"""
     try:
-        role = "barber" if current_user.is_barber else "customer"
-        
+        # Served from the session cache when warm - no DB round-trip on
+        # what is the highest-QPS auth endpoint
+        current_session, username, is_barber = auth
+
         return ResponseSchema(
             code="200",
             status="OK",
             message="Token is valid",
             result={
-                "user_id": current_user.id,
-                "username": current_user.username,
-                "role": role,
+                "user_id": current_session.user_id,
+                "username": username,
+                "role": "barber" if is_barber else "customer",
                 "session_id": current_session.id,
                 "is_active": current_session.is_active
             }
         ).dict(exclude_none=True)
         
     except Exception as error:
-        print(f"Verify token error: {error}")
+        logger.exception("Verify token error")
         return ResponseSchema(
             code="500",
             status="Error",
@@ -1,15 +1,15 @@
 # tables/bookings.py - Enhanced booking table with ratings
-from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Text
+from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Text, Index, and_
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config import Base
-import datetime
 
 class Booking(Base):
     __tablename__ = "bookings"
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("users.id"))
-    slot_id = Column(Integer, ForeignKey("slots.id"))
+    slot_id = Column(Integer, ForeignKey("slots.id"), index=True)
     status = Column(String, default="pending")  # pending, confirmed, in_progress, completed, cancelled, no_show
     special_requests = Column(Text, nullable=True)  # Customer's special requests
     cancellation_reason = Column(String(200), nullable=True)  # Reason for cancellation
@@ -19,11 +19,32 @@ class Booking(Base):
     review_text = Column(Text, nullable=True)  # Customer's review
     
     # Timestamps
-    booked_at = Column(DateTime, default=datetime.datetime.utcnow)
+    booked_at = Column(DateTime, server_default=func.timezone('utc', func.now()))
     updated_at = Column(DateTime, nullable=True)
     cancelled_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
     # Relationships
     customer = relationship("Users", foreign_keys=[customer_id])
-    slot = relationship("Slot", backref="booking")
\ No newline at end of file
+    slot = relationship("Slot", backref="booking")
+
+# Composite index for the customer booking lists, which always filter on
+# customer_id and usually narrow by status (upcoming/history views)
+Index(
+    'ix_bookings_customer_status',
+    Booking.customer_id,
+    Booking.status
+)
+
+# Partial index for the shop "recent reviews" query - only bookings that
+# actually carry a rating and review text are indexed, so the
+# ORDER BY completed_at DESC LIMIT 5 walk touches a handful of rows
+Index(
+    'ix_bookings_recent_reviews',
+    Booking.slot_id,
+    Booking.completed_at.desc(),
+    postgresql_where=and_(
+        Booking.rating.isnot(None),
+        Booking.review_text.isnot(None)
+    )
+)
\ No newline at end of file
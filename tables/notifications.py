@@ -1,8 +1,8 @@
 # tables/notifications.py - Updated notification table
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, Index
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config import Base
-import datetime
 
 class Notification(Base):
     __tablename__ = 'notifications'
@@ -18,8 +18,25 @@ class Notification(Base):
     sent_to_devices = Column(JSON, nullable=True)  # Track which devices received push notification
     push_success_count = Column(Integer, default=0)  # Number of devices that received push
     push_failure_count = Column(Integer, default=0)  # Number of devices that failed to receive push
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone('utc', func.now()))
 
     # Relationships
     user = relationship("Users", back_populates="notifications")
     booking = relationship("Booking")
+
+# Composite index behind the per-user notification list (ORDER BY
+# created_at DESC) and the stats aggregate, which both filter on user_id
+Index(
+    'ix_notifications_user_created',
+    Notification.user_id,
+    Notification.created_at.desc()
+)
+
+# Partial index for the unread paths (unread_only listing, badge
+# count); rows flip to is_read=True and drop out, keeping it tiny
+Index(
+    'ix_notifications_user_unread',
+    Notification.user_id,
+    Notification.created_at.desc(),
+    postgresql_where=(Notification.is_read == False)
+)
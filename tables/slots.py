@@ -1,8 +1,8 @@
 # tables/slots.py - Updated with start_time, end_time, date, and barber relationship
-from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Time, Date
+from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Time, Date, Index
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config import Base
-import datetime
 
 class Slot(Base):
     __tablename__ = 'slots'
@@ -20,8 +20,12 @@ class Slot(Base):
     
     is_booked = Column(Boolean, default=False)
     booked_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone('utc', func.now()))
     
     # Add the missing relationship to barber
     barber = relationship("Users", foreign_keys=[barber_id], back_populates="barber_slots")
-    booked_by_user = relationship("Users", foreign_keys=[booked_by])
\ No newline at end of file
+    booked_by_user = relationship("Users", foreign_keys=[booked_by])
+
+# Composite index matching the hot list/count filters: every slot listing
+# narrows by barber, date range and availability in that order
+Index('ix_slots_barber_date_booked', Slot.barber_id, Slot.slot_date, Slot.is_booked)
\ No newline at end of file
@@ -1,5 +1,6 @@
 # tables/user_devices.py - New table for managing multiple devices per user
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config import Base
 import datetime
@@ -21,15 +22,21 @@ class UserDevice(Base):
     device_name = Column(String(255), nullable=True) # User-friendly device name
     browser_info = Column(String(500), nullable=True) # Browser info for web devices
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone('utc', func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone('utc', func.now()), onupdate=datetime.datetime.utcnow)
+    last_seen = Column(DateTime, server_default=func.timezone('utc', func.now()))
 
     # Relationship
     user = relationship("Users", back_populates="devices")
 
-
-
+# Partial index for the push fan-out query, which always filters
+# user_id AND is_active - inactive (pruned) devices never make it into
+# the index, so it stays small as stale tokens accumulate
+Index(
+    'ix_user_devices_user_active',
+    UserDevice.user_id,
+    postgresql_where=(UserDevice.is_active == True)
+)
 
 # Update tables/users.py - Add device relationship
 # Add this line to the Users class in tables/users.py:
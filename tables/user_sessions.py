@@ -1,8 +1,8 @@
 # tables/user_sessions.py - New table for session management
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config import Base
-import datetime
 
 class UserSession(Base):
     __tablename__ = 'user_sessions'
@@ -10,15 +10,25 @@ class UserSession(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     session_token = Column(String(255), unique=True, nullable=False)
-    device_info = Column(String(500))  # Store device/browser info
+    device_info = Column(String(64))   # Parsed "Browser/Platform" label
     ip_address = Column(String(45))    # Store IP address (IPv6 compatible)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    last_accessed = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone('utc', func.now()))
+    last_accessed = Column(DateTime, server_default=func.timezone('utc', func.now()))
     is_active = Column(Boolean, default=True)
 
     # Relationship to user
     user = relationship("Users", back_populates="sessions")
 
+# Partial composite index for the per-user active-session queries
+# (/sessions listing, MAX_SESSIONS_PER_USER cleanup). session_token already
+# gets a unique index from unique=True, so token lookups are seek-only.
+Index(
+    'ix_user_sessions_user_active_last',
+    UserSession.user_id,
+    UserSession.last_accessed.desc(),
+    postgresql_where=(UserSession.is_active == True)
+)
+
 # Update the Users table to include the relationship
 # Add this to your existing tables/users.py
 # In the Users class, add:
@@ -1,8 +1,8 @@
 # tables/users.py - Updated with device relationship
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config import Base
-import datetime
 
 class Users(Base):
     __tablename__ = 'users'
@@ -10,8 +10,8 @@ class Users(Base):
     id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, index=True)
     password = Column(String)
-    email = Column(String)
-    phone_number = Column(String)
+    email = Column(String, index=True)  # Checked for collisions on profile update
+    phone_number = Column(String, unique=True, index=True)  # Login looks users up by phone
     first_name = Column(String)
     last_name = Column(String)
     is_barber = Column(Boolean, default=False)
@@ -19,7 +19,7 @@ class Users(Base):
     shop_address = Column(String, nullable=True)
     shop_image_url = Column(String, nullable=True)
     license_number = Column(String, nullable=True)
-    create_date = Column(DateTime, default=datetime.datetime.utcnow)
+    create_date = Column(DateTime, server_default=func.timezone('utc', func.now()))
     update_date = Column(DateTime)
     shop_status = Column(Boolean, default=True, nullable=True)  # True = open, False = closed 
 
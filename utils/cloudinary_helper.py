@@ -5,6 +5,11 @@ import cloudinary.uploader
 from fastapi import HTTPException
 from config import CLOUDINARY_ENABLED
 
+# Above this size, go through upload_large so the transfer is chunked
+# instead of one multipart POST holding the whole image in flight
+LARGE_UPLOAD_THRESHOLD_BYTES = 5 * 1024 * 1024
+LARGE_UPLOAD_CHUNK_BYTES = 6 * 1024 * 1024
+
 def upload_base64_image(base64_string: str, folder: str = "barbershop") -> str:
     """
     Upload a base64 encoded image to Cloudinary
@@ -23,16 +28,27 @@ def upload_base64_image(base64_string: str, folder: str = "barbershop") -> str:
         # Remove data:image prefix if present
         if base64_string.startswith('data:image'):
             base64_string = base64_string.split(',')[1]
-        
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
-            f"data:image/png;base64,{base64_string}",
-            folder=folder,
-            resource_type="image",
-            quality="auto",
-            fetch_format="auto"
-        )
-        
+
+        # Decode once here (C-speed binascii) and hand the SDK raw bytes -
+        # rebuilding a data URI would make Cloudinary re-parse and
+        # re-decode the same payload, doubling peak memory per upload
+        raw = base64.b64decode(base64_string)
+        if len(raw) > LARGE_UPLOAD_THRESHOLD_BYTES:
+            result = cloudinary.uploader.upload_large(
+                io.BytesIO(raw),
+                chunk_size=LARGE_UPLOAD_CHUNK_BYTES,
+                folder=folder,
+                resource_type="image"
+            )
+        else:
+            result = cloudinary.uploader.upload(
+                io.BytesIO(raw),
+                folder=folder,
+                resource_type="image",
+                quality="auto",
+                fetch_format="auto"
+            )
+
         return result['secure_url']
     
     except Exception as e:
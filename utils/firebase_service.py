@@ -1,13 +1,26 @@
 # utils/firebase_service.py - Clean Firebase service
 import firebase_admin
 from firebase_admin import credentials, messaging, exceptions
-import json
+import orjson
 import os
 from typing import Optional, Dict, Any, List
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# FCM caps a single multicast batch at 500 tokens
+MULTICAST_CHUNK_SIZE = 500
+
+# Known send failures mapped to (error code, should prune the token).
+# One lookup replaces a per-type isinstance ladder and gives a single
+# place to classify new Firebase error types.
+_SEND_ERROR_CODES = {
+    messaging.UnregisteredError: ("unregistered_token", True),
+    messaging.SenderIdMismatchError: ("sender_mismatch", True),
+    exceptions.InvalidArgumentError: ("invalid_argument", False),
+}
+
 class FirebaseService:
     _initialized = False
     _app = None
@@ -24,7 +37,7 @@ class FirebaseService:
                 logger.error("FIREBASE_SERVICE_ACCOUNT environment variable not found")
                 return False
                 
-            service_account_info = json.loads(firebase_service_account)
+            service_account_info = orjson.loads(firebase_service_account)
             
             # Validate required fields
             required_fields = ['type', 'project_id', 'private_key', 'client_email']
@@ -40,7 +53,7 @@ class FirebaseService:
             logger.info(f"Firebase initialized successfully for project: {service_account_info.get('project_id')}")
             return True
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Error parsing Firebase service account JSON: {e}")
             return False
         except Exception as e:
@@ -66,9 +79,7 @@ class FirebaseService:
         
         try:
             # Prepare data (FCM requires string values)
-            notification_data = {}
-            if data:
-                notification_data = {k: str(v) for k, v in data.items()}
+            notification_data = {k: "" if v is None else str(v) for k, v in (data or {}).items()}
             
             # Build message based on device type
             if device_type.lower() == "web":
@@ -112,22 +123,31 @@ class FirebaseService:
                     )
                 )
             
-            response = messaging.send(message)
-            logger.info(f"Notification sent successfully to {device_type} device: {response}")
-            return {"success": True, "response": response}
-            
-        except messaging.UnregisteredError:
-            logger.warning(f"FCM token is unregistered: {token[:20]}...")
-            return {"success": False, "error": "unregistered_token", "should_remove": True}
-        except exceptions.InvalidArgumentError as e:
-            logger.error(f"Invalid argument: {e}")
-            return {"success": False, "error": "invalid_argument"}
-        except messaging.SenderIdMismatchError:
-            logger.error("Sender ID mismatch")
-            return {"success": False, "error": "sender_mismatch", "should_remove": True}
+            # send_each_async rides the SDK's shared aiohttp session, so
+            # the event loop overlaps the FCM round-trip instead of
+            # blocking in requests like messaging.send() does.
+            batch = await messaging.send_each_async([message])
         except Exception as e:
             logger.error(f"Unexpected error sending notification: {e}")
             return {"success": False, "error": str(e)}
+
+        response = batch.responses[0]
+        if response.success:
+            logger.info(f"Notification sent successfully to {device_type} device: {response.message_id}")
+            return {"success": True, "response": response.message_id}
+
+        exception = response.exception
+        classified = _SEND_ERROR_CODES.get(type(exception))
+        if classified is None:
+            logger.error(f"Unexpected error sending notification: {exception}")
+            return {"success": False, "error": str(exception)}
+
+        error_code, should_remove = classified
+        logger.warning(f"Notification send failed ({error_code}) for token {token[:20]}...: {exception}")
+        result = {"success": False, "error": error_code}
+        if should_remove:
+            result["should_remove"] = True
+        return result
     
     @classmethod
     async def send_to_multiple_devices(
@@ -137,10 +157,15 @@ class FirebaseService:
         body: str,
         data: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Send notifications to multiple devices with different types"""
+        """Send notifications to multiple devices with different types.
+
+        Devices are grouped by platform config (web vs android/ios) and
+        each group goes out as one multicast batch call, instead of one
+        FCM round-trip per device.
+        """
         if not cls.initialize():
             return {"success": False, "error": "Firebase not initialized"}
-        
+
         results = {
             "total": len(tokens_with_types),
             "success": 0,
@@ -148,26 +173,82 @@ class FirebaseService:
             "tokens_to_remove": [],
             "errors": []
         }
-        
+
+        notification_data = {k: "" if v is None else str(v) for k, v in (data or {}).items()}
+
+        web_devices = []
+        mobile_devices = []
         for device_info in tokens_with_types:
-            token = device_info["token"]
             device_type = device_info.get("type", "android")
-            
-            result = await cls.send_notification(token, title, body, data, device_type)
-            
-            if result["success"]:
-                results["success"] += 1
+            if device_type.lower() == "web":
+                web_devices.append((device_info["token"], device_type))
             else:
-                results["failed"] += 1
+                mobile_devices.append((device_info["token"], device_type))
+
+        # One MulticastMessage per platform group, chunked to the FCM
+        # batch cap, then all batches go out concurrently on one gather.
+        jobs = []
+        for group in (web_devices, mobile_devices):
+            is_web = group is web_devices
+            for start in range(0, len(group), MULTICAST_CHUNK_SIZE):
+                chunk = group[start:start + MULTICAST_CHUNK_SIZE]
+                message = messaging.MulticastMessage(
+                    notification=messaging.Notification(title=title, body=body),
+                    data=notification_data,
+                    tokens=[token for token, _ in chunk],
+                    webpush=messaging.WebpushConfig(
+                        notification=messaging.WebpushNotification(
+                            title=title,
+                            body=body,
+                            icon="/icon-192x192.png"
+                        )
+                    ) if is_web else None,
+                    android=None if is_web else messaging.AndroidConfig(
+                        priority="high",
+                        notification=messaging.AndroidNotification(
+                            title=title,
+                            body=body,
+                            sound="default"
+                        )
+                    ),
+                    apns=None if is_web else messaging.APNSConfig(
+                        payload=messaging.APNSPayload(
+                            aps=messaging.Aps(
+                                alert=messaging.ApsAlert(title=title, body=body),
+                                sound="default"
+                            )
+                        )
+                    )
+                )
+                jobs.append((chunk, message))
+
+        batches = await asyncio.gather(
+            *(messaging.send_each_for_multicast_async(message) for _, message in jobs),
+            return_exceptions=True
+        )
+
+        for (chunk, _), batch in zip(jobs, batches):
+            if isinstance(batch, Exception):
+                logger.error(f"Error sending multicast batch: {batch}")
+                results["failed"] += len(chunk)
+                results["errors"].append({"error": str(batch), "tokens": len(chunk)})
+                continue
+
+            results["success"] += batch.success_count
+            results["failed"] += batch.failure_count
+
+            for (token, device_type), response in zip(chunk, batch.responses):
+                if response.success:
+                    continue
+                exception = response.exception
                 results["errors"].append({
                     "token": token[:20] + "...",
-                    "error": result["error"],
+                    "error": str(exception),
                     "device_type": device_type
                 })
-                
-                if result.get("should_remove"):
+                if isinstance(exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
                     results["tokens_to_remove"].append(token)
-        
+
         return results
     
     @classmethod
@@ -1,12 +1,13 @@
 # utils/notification_service.py - Clean notification service
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from tables.notifications import Notification
 from tables.user_devices import UserDevice
 from tables.users import Users
 from tables.bookings import Booking
 from utils.firebase_service import FirebaseService
 from datetime import datetime
+from time import monotonic
 from typing import Dict, Any, List, Optional
 import logging
 from datetime import timedelta
@@ -14,8 +15,32 @@ from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# Window for the "recent" stats bucket; built once instead of per call
+RECENT_WINDOW = timedelta(hours=24)
+
+# Per-instance cache for the stats endpoint, which clients poll for
+# badge counts. Same bounded-dict shape as the session cache in
+# repository/users.py: [expiry, value] entries, wholesale clear when
+# full, invalidated on any write that changes the counts.
+STATS_CACHE_TTL_SECONDS = 60
+STATS_CACHE_MAX_ENTRIES = 1024
+_stats_cache = {}
+
+
+def _invalidate_stats_cache(user_id: int):
+    _stats_cache.pop(user_id, None)
+
 class NotificationService:
-    
+
+    @staticmethod
+    def invalidate_stats_cache(user_id: int):
+        """Drop a user's cached stats after a count-changing write.
+
+        Public hook for writes that live outside this module (the
+        delete endpoints in routes/notifications.py).
+        """
+        _invalidate_stats_cache(user_id)
+
     @staticmethod
     async def create_and_send_notification(
         db: Session,
@@ -40,41 +65,52 @@ class NotificationService:
         )
         
         db.add(notification)
-        db.commit()
-        db.refresh(notification)
-        
+        db.flush()
         logger.info(f"Created notification {notification.id} for user {user_id}")
-        
-        # Send push notifications
-        await NotificationService._send_push_notifications(db, notification)
-        
+
+        # Commit the row before the push goes out: the in-app
+        # notification must survive a failed send, and committing here
+        # keeps the transaction (and its pooled connection) from being
+        # held open across the FCM await. Still no db.refresh - the
+        # flush assigns the id, which is all the log line needs.
+        db.commit()
+        _invalidate_stats_cache(user_id)
+
+        # Send push notifications; delivery is best-effort and its
+        # bookkeeping commits separately in _send_push_notifications
+        try:
+            await NotificationService._send_push_notifications(db, notification)
+        except Exception:
+            logger.exception(f"Push delivery failed for notification {notification.id}")
+
         return notification
     
     @staticmethod
     async def _send_push_notifications(db: Session, notification: Notification):
         """Send push notifications to all active devices of the user"""
         
-        # Get user's active devices
-        devices = db.query(UserDevice).filter(
+        # Active devices and the notifications_enabled flag in one JOIN
+        # instead of separate devices and user round-trips
+        rows = db.query(UserDevice, Users.notifications_enabled).join(
+            Users, Users.id == UserDevice.user_id
+        ).filter(
             and_(
                 UserDevice.user_id == notification.user_id,
                 UserDevice.is_active == True
             )
         ).all()
-        
-        if not devices:
+
+        if not rows:
             logger.info(f"No active devices found for user {notification.user_id}")
             return
-        
-        # Check if user has notifications enabled
-        user = db.query(Users).filter(Users.id == notification.user_id).first()
-        if not user or not user.notifications_enabled:
+
+        if not rows[0][1]:
             logger.info(f"Notifications disabled for user {notification.user_id}")
             return
-        
+
         # Prepare device tokens
         tokens_with_types = []
-        for device in devices:
+        for device, _ in rows:
             tokens_with_types.append({
                 "token": device.fcm_token,
                 "type": device.device_type.value,
@@ -95,7 +131,7 @@ class NotificationService:
             push_data.update({k: str(v) for k, v in notification.data.items()})
         
         # Send notifications
-        logger.info(f"Sending push notifications to {len(devices)} devices for user {notification.user_id}")
+        logger.info(f"Sending push notifications to {len(rows)} devices for user {notification.user_id}")
         
         results = await FirebaseService.send_to_multiple_devices(
             tokens_with_types,
@@ -109,14 +145,13 @@ class NotificationService:
         notification.push_failure_count = results["failed"]
         notification.sent_to_devices = [d["device_id"] for d in tokens_with_types]
         
-        # Remove invalid tokens
+        # Deactivate invalid tokens in one bulk UPDATE instead of one per token
         if results["tokens_to_remove"]:
             logger.info(f"Removing {len(results['tokens_to_remove'])} invalid tokens")
-            for token in results["tokens_to_remove"]:
-                db.query(UserDevice).filter(UserDevice.fcm_token == token).update({
-                    "is_active": False
-                })
-        
+            db.query(UserDevice).filter(
+                UserDevice.fcm_token.in_(results["tokens_to_remove"])
+            ).update({"is_active": False}, synchronize_session=False)
+
         db.commit()
         logger.info(f"Push notification results: {results['success']} success, {results['failed']} failed")
     
@@ -131,14 +166,15 @@ class NotificationService:
     ):
         """Notify barber when new booking is received"""
         logger.info(f"Sending booking received notification to barber {barber.id}")
-        
+
+        customer_name = f"{customer.first_name} {customer.last_name}"
         title = "New Booking Received"
-        message = f"{customer.first_name} {customer.last_name} has booked a slot with you."
-        
+        message = f"{customer_name} has booked a slot with you."
+
         # Get slot details for additional data
         slot = booking.slot
         additional_data = {
-            "customer_name": f"{customer.first_name} {customer.last_name}",
+            "customer_name": customer_name,
             "customer_phone": customer.phone_number,
             "slot_date": slot.slot_date.isoformat(),
             "slot_time": slot.start_time.strftime("%H:%M"),
@@ -158,14 +194,15 @@ class NotificationService:
     ):
         """Notify customer when booking is confirmed"""
         logger.info(f"Sending booking confirmed notification to customer {customer.id}")
-        
+
+        barber_name = f"{barber.first_name} {barber.last_name}"
         title = "Booking Confirmed"
-        shop_name = barber.shop_name or f"{barber.first_name} {barber.last_name}"
+        shop_name = barber.shop_name or barber_name
         message = f"Your booking with {shop_name} has been confirmed."
-        
+
         slot = booking.slot
         additional_data = {
-            "barber_name": f"{barber.first_name} {barber.last_name}",
+            "barber_name": barber_name,
             "shop_name": shop_name,
             "slot_date": slot.slot_date.isoformat(),
             "slot_time": slot.start_time.strftime("%H:%M"),
@@ -190,13 +227,14 @@ class NotificationService:
             # Notify customer
             logger.info(f"Sending booking cancelled notification to customer {customer.id}")
             
+            barber_name = f"{barber.first_name} {barber.last_name}"
             title = "Booking Cancelled"
-            shop_name = barber.shop_name or f"{barber.first_name} {barber.last_name}"
+            shop_name = barber.shop_name or barber_name
             message = f"Your booking with {shop_name} has been cancelled."
-            
+
             additional_data = {
                 "cancelled_by": "barber",
-                "barber_name": f"{barber.first_name} {barber.last_name}",
+                "barber_name": barber_name,
                 "shop_name": shop_name,
                 "action": "view_bookings"
             }
@@ -208,12 +246,13 @@ class NotificationService:
             # Notify barber
             logger.info(f"Sending booking cancelled notification to barber {barber.id}")
             
+            customer_name = f"{customer.first_name} {customer.last_name}"
             title = "Booking Cancelled"
-            message = f"{customer.first_name} {customer.last_name} has cancelled their booking."
-            
+            message = f"{customer_name} has cancelled their booking."
+
             additional_data = {
                 "cancelled_by": "customer",
-                "customer_name": f"{customer.first_name} {customer.last_name}",
+                "customer_name": customer_name,
                 "customer_phone": customer.phone_number,
                 "action": "view_bookings"
             }
@@ -301,28 +340,54 @@ class NotificationService:
         user_id: int,
         unread_only: bool = False,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        before_id: Optional[int] = None
     ) -> List[Notification]:
-        """Get user's notifications"""
+        """Get user's notifications.
+
+        Pass before_id (the smallest id from the previous page) for keyset
+        pagination: an index seek regardless of page depth, unlike OFFSET
+        which scans and discards every skipped row. The offset path stays
+        for callers that don't paginate by cursor. Ordering by id matches
+        created_at ordering since ids are assigned monotonically.
+        """
         query = db.query(Notification).filter(Notification.user_id == user_id)
-        
+
         if unread_only:
             query = query.filter(Notification.is_read == False)
-        
+
+        if before_id is not None:
+            return query.filter(Notification.id < before_id).order_by(
+                Notification.id.desc()
+            ).limit(limit).all()
+
         return query.order_by(Notification.created_at.desc()).offset(offset).limit(limit).all()
     
     @staticmethod
     def mark_notification_read(db: Session, notification_id: int, user_id: int) -> bool:
         """Mark notification as read"""
-        notification = db.query(Notification).filter(
-            and_(Notification.id == notification_id, Notification.user_id == user_id)
-        ).first()
-        
-        if notification:
-            notification.is_read = True
-            db.commit()
+        # Conditional UPDATE: already-read rows are skipped entirely, so
+        # repeated marks don't rewrite the row (or WAL) for nothing
+        updated = db.query(Notification).filter(
+            and_(
+                Notification.id == notification_id,
+                Notification.user_id == user_id,
+                Notification.is_read == False
+            )
+        ).update({"is_read": True}, synchronize_session=False)
+        db.commit()
+
+        if updated:
+            _invalidate_stats_cache(user_id)
             return True
-        return False
+
+        # Nothing updated: distinguish "already read" (still a success to
+        # the caller) from "not found" with a cheap EXISTS probe
+        return db.query(
+            db.query(Notification.id).filter(
+                and_(Notification.id == notification_id, Notification.user_id == user_id)
+            ).exists()
+        ).scalar()
     
     @staticmethod
     def mark_all_notifications_read(db: Session, user_id: int):
@@ -331,29 +396,37 @@ class NotificationService:
             and_(Notification.user_id == user_id, Notification.is_read == False)
         ).update({"is_read": True})
         db.commit()
+        _invalidate_stats_cache(user_id)
     
     @staticmethod
     def get_notification_stats(db: Session, user_id: int) -> Dict[str, int]:
         """Get notification statistics for user"""
-        total = db.query(Notification).filter(Notification.user_id == user_id).count()
-        unread = db.query(Notification).filter(
-            and_(Notification.user_id == user_id, Notification.is_read == False)
-        ).count()
-        
-        # Recent notifications (last 24 hours)
-        recent_time = datetime.utcnow() - timedelta(hours=24)
-        recent = db.query(Notification).filter(
-            and_(Notification.user_id == user_id, Notification.created_at >= recent_time)
-        ).count()
-        
-        # Active devices count
+        cached = _stats_cache.get(user_id)
+        if cached is not None and cached[0] > monotonic():
+            return cached[1]
+
+        # Total, unread and recent (last 24h) in one aggregate pass over
+        # the user's notifications instead of three separate COUNTs
+        recent_time = datetime.utcnow() - RECENT_WINDOW
+        total, unread, recent = db.query(
+            func.count(Notification.id),
+            func.count(Notification.id).filter(Notification.is_read == False),
+            func.count(Notification.id).filter(Notification.created_at >= recent_time)
+        ).filter(Notification.user_id == user_id).one()
+
+        # Active devices count (different table, stays its own query)
         active_devices = db.query(UserDevice).filter(
             and_(UserDevice.user_id == user_id, UserDevice.is_active == True)
         ).count()
-        
-        return {
+
+        stats = {
             "total_notifications": total,
             "unread_count": unread,
             "recent_count": recent,
             "active_devices": active_devices
-        }
\ No newline at end of file
+        }
+
+        if len(_stats_cache) >= STATS_CACHE_MAX_ENTRIES:
+            _stats_cache.clear()
+        _stats_cache[user_id] = [monotonic() + STATS_CACHE_TTL_SECONDS, stats]
+        return stats
\ No newline at end of file